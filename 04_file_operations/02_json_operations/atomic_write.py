@@ -0,0 +1,123 @@
+"""Replace a file's contents so that readers never see a half-written file.
+
+Opening a file with "w" empties it straight away. If the program crashes
+before it finishes writing, or two programs write at the same time, the file
+is left empty or mixed up. atomic_write() writes to a temporary file in the
+same folder instead, forces it to disk and then renames it over the target.
+The rename is atomic: anyone opening the file sees either the old contents or
+the new ones.
+
+    with atomic_write("countries.json") as f:
+        json.dump(countries, f)
+
+With lock=True, writers also take an advisory lock on "<file>.lock", so a
+read-modify-write done inside file_lock() is not undone by another process.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl  # Unix
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt  # Windows
+except ImportError:
+    msvcrt = None
+
+# The umask can only be read by setting it, which would race with other threads
+# creating files at the same time, so read it once when the module is imported.
+# app.py keeps a copy of this and of _permissions_for(), as it cannot import this file.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def file_lock(file_name):
+    """Hold an exclusive advisory lock for file_name while the with-block runs.
+
+    The lock is taken on a separate "<file>.lock" file, because the file itself
+    is replaced by every atomic write. Only programs that also use file_lock()
+    wait for it; it does not stop anyone else from opening the file.
+    """
+    lock_path = Path(file_name).with_name(Path(file_name).name + ".lock")
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _sync_folder(folder):
+    """Make the rename itself survive a power cut (only possible on Unix)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _permissions_for(path):
+    """Keep the permissions of the file being replaced (a new temp file would be private)."""
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_write(file_name, mode="w", encoding="utf-8", lock=False):
+    """Open a temporary file for writing; when the with-block ends it replaces file_name.
+
+    If the block raises, the temporary file is deleted and file_name is untouched.
+    mode is "w" for text or "wb" for bytes.
+    """
+    if mode not in ("w", "wb"):
+        raise ValueError(f"atomic_write() only supports mode 'w' or 'wb', not {mode!r}")
+    path = Path(file_name)
+    folder = path.parent
+    if lock:
+        with file_lock(path):
+            with atomic_write(path, mode, encoding) as f:
+                yield f
+        return
+
+    # Same folder as the target: a rename only works within one file system
+    fd, temp_name = tempfile.mkstemp(dir=folder, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # Wrapped first, so the descriptor is closed even if chmod fails
+        with open(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            os.chmod(temp_name, _permissions_for(path))
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+    _sync_folder(folder)
+
+
+def write_text_atomic(file_name, text, encoding="utf-8", lock=False):
+    """Like Path.write_text(), but atomic; returns the number of characters written."""
+    with atomic_write(file_name, "w", encoding, lock) as f:
+        return f.write(text)
+
+
+def write_bytes_atomic(file_name, data, lock=False):
+    """Like Path.write_bytes(), but atomic; returns the number of bytes written."""
+    with atomic_write(file_name, "wb", lock=lock) as f:
+        return f.write(data)
@@ -0,0 +1,81 @@
+# Benchmark for json_codec.py
+#
+# Builds a large list shaped like countries_data.json (a list of names), and a
+# list of small records, then times dumps() and loads() of every installed
+# codec on them. The results are printed as JSON, so runs can be compared.
+#
+# Example:
+#   python benchmark_json_codecs.py --items 1000000 --repeat 5 --output codecs.json
+import argparse
+import json
+import platform
+import random
+import string
+import time
+
+from json_codec import CODECS
+
+
+# A list of names like countries_data.json, and a list of records like a bulk export
+def make_data(items, seed=0):
+    rng = random.Random(seed)
+    names = ["".join(rng.choices(string.ascii_letters, k=rng.randint(4, 12))) for _ in range(items)]
+    records = [{"id": i, "name": name, "visited": i % 3 == 0, "rating": round(rng.random() * 5, 2),
+                "tags": [name[:3], "travel"]} for i, name in enumerate(names)]
+    return {"names": names, "records": records}
+
+
+# Best of repeat runs, in seconds (the minimum is the least disturbed by other programs)
+def best_time(function, argument, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the speed of the installed JSON codecs")
+    parser.add_argument("--items", type=int, default=200_000, help="entries per list")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--codecs", nargs="+", choices=sorted(CODECS), default=list(CODECS))
+    parser.add_argument("--output", help="write the JSON report to this file instead of printing it")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "items": args.items,
+        "results": [],
+    }
+    for data_name, data in make_data(args.items).items():
+        for codec_name in args.codecs:
+            codec = CODECS[codec_name]
+            encoded = codec.dumps(data)
+            # Every codec must read back exactly what was written
+            if codec.loads(encoded) != data:
+                raise SystemExit(f"{codec_name} did not round-trip the {data_name} list")
+            dumps_seconds = best_time(codec.dumps, data, args.repeat)
+            loads_seconds = best_time(codec.loads, encoded, args.repeat)
+            megabytes = len(encoded) / (1024 * 1024)
+            report["results"].append({
+                "data": data_name,
+                "codec": codec_name,
+                "size_mb": round(megabytes, 2),
+                "dumps_seconds": round(dumps_seconds, 4),
+                "loads_seconds": round(loads_seconds, 4),
+                "dumps_mb_per_sec": round(megabytes / dumps_seconds, 1),
+                "loads_mb_per_sec": round(megabytes / loads_seconds, 1),
+            })
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,59 @@
-import json
 from pathlib import Path
 
+from atomic_write import atomic_write
+from indexed_json_store import IndexedJsonStore
+from json_codec import get_codec
+from json_lines_store import JsonLinesStore
+from json_stream import iter_json_array
+
 FILE_NAME = 'countries.json'
-def save_to_json(data, file_name = FILE_NAME):
+JSON_LINES_FILE_NAME = 'countries.jsonl'
+STORE_FILE_NAME = 'countries.db'
+def save_to_json(data, file_name = FILE_NAME, lock=False):
     """Save the list of places to a json file """
-    with Path.open(file_name,"w") as f:
-        json.dump(data, f)
+    # atomic_write replaces the file in one step, so a crash or a second writer
+    # can never leave it empty or half-written; lock=True also waits for other writers.
+    # get_codec() is orjson/msgspec when installed (much faster), else the json module;
+    # see json_codec.py for the few values they store differently.
+    with atomic_write(file_name, "wb", lock=lock) as f:
+        f.write(get_codec().dumps(data))
     
 def read_from_json(file_name=FILE_NAME):
     try:
-        with Path.open(file_name, "r") as f:
-            return json.load(f)
+        return get_codec().loads(Path(file_name).read_bytes())
     except FileNotFoundError:
         return []  # Return empty list if file doesn't exist
+
+def iter_from_json(file_name=FILE_NAME):
+    """Yield the saved places one at a time, without loading the whole file (for huge files)"""
+    try:
+        yield from iter_json_array(file_name)
+    except FileNotFoundError:
+        return
+
+def append_to_json_lines(place, file_name=JSON_LINES_FILE_NAME):
+    """Add one place to a JSON Lines file, without rewriting the places already saved"""
+    JsonLinesStore(file_name).append(place)
+
+def read_from_json_lines(file_name=JSON_LINES_FILE_NAME):
+    """Yield the saved places one at a time (nothing if the file doesn't exist)"""
+    return JsonLinesStore(file_name).iter_records()
+
+def save_to_store(data, file_name=STORE_FILE_NAME):
+    """Save the list of places to an indexed store, so single places can be looked up quickly"""
+    with IndexedJsonStore(file_name) as store:
+        store.save(data)
+
+def is_already_added(place, file_name=STORE_FILE_NAME, store=None):
+    """Check one place without loading the whole list (uses the store's index)
+    Pass an open store to check many places; otherwise the file is opened read-only for this one check"""
+    if store is not None:
+        return place in store
+    try:
+        with IndexedJsonStore(file_name, read_only=True) as store:
+            return place in store
+    except FileNotFoundError:
+        return False
         
 def main():
     countries = []
@@ -0,0 +1,139 @@
+"""A list of JSON records that can be looked up by key without reading the file.
+
+save_to_json()/read_from_json() have to load and scan the whole list to answer
+"has this country been added already?". IndexedJsonStore keeps the records in
+an SQLite database (built into Python) with an index on their key, so get(),
+contains() and prefix lookups only read a few pages of the file. They stay
+well under a millisecond even with millions of records:
+
+    store = IndexedJsonStore("countries.db")
+    store.save(["India", "Nepal", "Japan"])     # same as save_to_json
+    store.read()                                # same as read_from_json
+    store.contains("Nepal")                     # True
+    store.prefix("Ja")                          # ["Japan"]
+
+By default a string record is its own key and a dict record is keyed by its
+"name"; pass key=... to choose something else, e.g. key=str.lower.
+"""
+import sqlite3
+from pathlib import Path
+
+from json_codec import get_codec
+
+# Sorts after every real character, so "Ja" <= key < "Ja" + _LAST_CHAR means "starts with Ja"
+_LAST_CHAR = "\U0010ffff"
+
+
+def default_key(record):
+    """Strings are their own key, dicts are keyed by their "name"."""
+    if isinstance(record, str):
+        return record
+    return record["name"]
+
+
+class IndexedJsonStore:
+    """Records stored in insertion order, with a unique index on key(record).
+
+    read_only=True opens an existing store for lookups only: nothing is created
+    or written, and opening a missing file raises FileNotFoundError.
+    """
+
+    def __init__(self, file_name="records.db", key=default_key, codec=None, read_only=False):
+        self.key = key
+        self.codec = codec or get_codec()
+        if read_only:
+            path = Path(file_name)
+            if not path.exists():
+                raise FileNotFoundError(f"No such store: {file_name}")
+            self.connection = sqlite3.connect(path.resolve().as_uri() + "?mode=ro", uri=True)
+            return
+        self.connection = sqlite3.connect(file_name)
+        # WAL lets readers keep reading while a save is in progress
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # id keeps the insertion order for read(); UNIQUE builds the index on key
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, value BLOB NOT NULL)"
+        )
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _rows(self, records):
+        dumps = self.codec.dumps
+        for record in records:
+            yield self.key(record), dumps(record)
+
+    def add(self, *records):
+        """Add records; a record whose key is already stored replaces the old one in place."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO records (key, value) VALUES (?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                self._rows(records),
+            )
+
+    def save(self, data):
+        """Replace everything stored with the records in data (like save_to_json).
+
+        Keys must be unique: two records with the same key raise ValueError and
+        leave the stored records unchanged (use add() to replace records by key).
+        """
+        last_key = None
+
+        def rows():
+            nonlocal last_key
+            for key, value in self._rows(data):
+                last_key = key
+                yield key, value
+
+        # One transaction: other readers see either the old or the new records
+        try:
+            with self.connection:
+                self.connection.execute("DELETE FROM records")
+                self.connection.executemany("INSERT INTO records (key, value) VALUES (?, ?)", rows())
+        except sqlite3.IntegrityError:
+            # executemany stops at the failing row, so last_key is the duplicate
+            raise ValueError(f"save() got more than one record with key {last_key!r}") from None
+
+    def read(self):
+        """All records, in the order they were added (like read_from_json)."""
+        loads = self.codec.loads
+        return [loads(value) for (value,) in self.connection.execute("SELECT value FROM records ORDER BY id")]
+
+    def get(self, key, default=None):
+        """The record stored under key, or default."""
+        row = self.connection.execute("SELECT value FROM records WHERE key = ?", (key,)).fetchone()
+        return default if row is None else self.codec.loads(row[0])
+
+    def contains(self, key):
+        return self.connection.execute("SELECT 1 FROM records WHERE key = ?", (key,)).fetchone() is not None
+
+    __contains__ = contains
+
+    def prefix(self, start, limit=None):
+        """Records whose key starts with start, sorted by key."""
+        # A range on the indexed column (LIKE 'Ja%' would scan the whole table)
+        query = "SELECT value FROM records WHERE key >= ? AND key < ? ORDER BY key"
+        parameters = (start, start + _LAST_CHAR)
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters += (limit,)
+        loads = self.codec.loads
+        return [loads(value) for (value,) in self.connection.execute(query, parameters)]
+
+    def delete(self, key):
+        """Remove the record stored under key; returns whether there was one."""
+        with self.connection:
+            return self.connection.execute("DELETE FROM records WHERE key = ?", (key,)).rowcount > 0
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
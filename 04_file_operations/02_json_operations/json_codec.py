@@ -0,0 +1,86 @@
+"""Pick the fastest JSON library that is installed.
+
+orjson and msgspec are written in Rust and C and turn Python objects into JSON
+(and back) several times faster than the built-in json module. They are
+optional: if neither is installed, the built-in module is used, so these
+helpers work everywhere.
+
+Every codec works on bytes, so files are read and written in binary mode and
+no extra text decoding/encoding step is needed. What dumps() cannot write
+fast (integers wider than 64 bits, unusual key types) is handed to the json
+module, so every codec accepts the same data. Two differences remain: the
+fast libraries write NaN and infinity as null, where the json module writes
+NaN/Infinity (which is not valid JSON anyway), and orjson reads integers
+wider than 64 bits back as floats. Use get_codec("json") (or JSON_CODEC=json)
+where such values must round-trip exactly.
+
+    codec = get_codec()             # fastest installed, or set JSON_CODEC=json
+    data = codec.loads(Path("countries_data.json").read_bytes())
+    Path("copy.json").write_bytes(codec.dumps(data))
+"""
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JsonCodec:
+    """A JSON library behind one interface: dumps(obj) -> bytes, loads(bytes) -> obj."""
+
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f"JsonCodec({self.name!r})"
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj).encode("utf-8")
+
+
+def _with_fallback(dumps, errors):
+    """dumps, but objects it rejects are written by the json module instead."""
+    def dumps_or_fallback(obj):
+        try:
+            return dumps(obj)
+        except errors:
+            return _stdlib_dumps(obj)
+    return dumps_or_fallback
+
+
+def _orjson_dumps(obj):
+    # Like the json module, write int, float, bool and None keys as strings
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Available codecs, fastest first
+CODECS = {}
+if orjson is not None:
+    # orjson.JSONEncodeError is a TypeError; too big integers are among its causes
+    CODECS["orjson"] = JsonCodec("orjson", _with_fallback(_orjson_dumps, TypeError), orjson.loads)
+if msgspec is not None:
+    CODECS["msgspec"] = JsonCodec("msgspec", _with_fallback(msgspec.json.encode, (TypeError, ValueError, OverflowError)),
+                                  msgspec.json.decode)
+CODECS["json"] = JsonCodec("json", _stdlib_dumps, json.loads)  # json.loads accepts bytes too
+
+# What loads() raises on invalid JSON (orjson's error is a ValueError, msgspec's is not)
+DECODE_ERRORS = (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+
+
+def get_codec(name=None):
+    """The codec called name, else the one named by $JSON_CODEC, else the fastest installed one."""
+    name = name or os.environ.get("JSON_CODEC")
+    if name is None:
+        return next(iter(CODECS.values()))
+    if name not in CODECS:
+        raise ValueError(f"JSON codec {name!r} is not available; installed: {', '.join(CODECS)}")
+    return CODECS[name]
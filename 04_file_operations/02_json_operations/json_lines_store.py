@@ -0,0 +1,125 @@
+"""A JSON Lines file stores one JSON value per line:
+
+    "India"
+    "Nepal"
+    {"name": "Japan", "visited": true}
+
+Unlike one big JSON list, adding a record only appends one line at the end of
+the file, so it takes the same time whether the file holds ten records or ten
+million. Reading goes line by line, so records can be processed one at a time
+without loading the whole file.
+"""
+import os
+from contextlib import nullcontext
+from pathlib import Path
+
+from atomic_write import atomic_write, file_lock
+from json_codec import DECODE_ERRORS, get_codec
+
+
+class JsonLinesStore:
+    """Append-only list of JSON records kept in a .jsonl file."""
+
+    def __init__(self, file_name, sync=True, codec=None, lock=False):
+        self.path = Path(file_name)
+        self.codec = codec or get_codec()
+        # sync=True waits until each append is really on disk (os.fsync);
+        # slower, but a record that append() returned for survives a power cut
+        self.sync = sync
+        # lock=True makes extend() and compact() take file_lock(), so a record another
+        # process appends while compact() rewrites the file is not lost
+        self.lock = lock
+        self._checked_tail = False
+
+    def _locked(self):
+        return file_lock(self.path) if self.lock else nullcontext()
+
+    def _repair_tail(self):
+        """Cut off a half-written last line left by a crash, so new lines don't get glued to it."""
+        try:
+            with open(self.path, "rb+") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size == 0:
+                    return
+                f.seek(size - 1)
+                if f.read(1) == b"\n":
+                    return
+                # Walk back to the last complete line
+                position = size
+                while position > 0:
+                    step = min(64 * 1024, position)
+                    f.seek(position - step)
+                    newline = f.read(step).rfind(b"\n")
+                    if newline != -1:
+                        position = position - step + newline + 1
+                        break
+                    position -= step
+                f.truncate(position)
+        except FileNotFoundError:
+            pass
+
+    def extend(self, records):
+        """Append several records with a single write (and a single fsync)."""
+        data = b"".join(self.codec.dumps(record) + b"\n" for record in records)
+        with self._locked():
+            if not self._checked_tail:
+                self._repair_tail()
+                self._checked_tail = True
+            if not data:
+                return
+            # "ab" always writes at the end of the file, even if another process appended meanwhile
+            with open(self.path, "ab") as f:
+                f.write(data)
+                f.flush()
+                if self.sync:
+                    os.fsync(f.fileno())
+
+    def append(self, record):
+        """Add one record at the end of the file."""
+        self.extend([record])
+
+    def iter_records(self):
+        """Yield the records one at a time, without loading the whole file."""
+        try:
+            with open(self.path, "rb") as f:
+                for number, line in enumerate(f, start=1):
+                    if not line.endswith(b"\n"):
+                        return  # Half-written last line from a crash: the record was never saved
+                    if not line.strip():
+                        continue
+                    try:
+                        yield self.codec.loads(line)
+                    except DECODE_ERRORS as error:
+                        raise ValueError(f"{self.path}, line {number}: {error}") from None
+        except FileNotFoundError:
+            return
+
+    def read_all(self):
+        """All records as a list."""
+        return list(self.iter_records())
+
+    def compact(self, key=None):
+        """Rewrite the file without blank or half-written lines.
+
+        With key (a function), only the last record for each key is kept,
+        e.g. compact(key=str.lower) drops countries that were added twice.
+        The new file is written next to the old one and then renamed over it,
+        so a crash during compact() leaves the old file untouched. Without
+        lock=True, records appended by another process while compact() runs
+        can be lost.
+        """
+        # The lock covers reading the old file through renaming the new one over it
+        with self._locked():
+            if key is None:
+                records = self.iter_records()
+            else:
+                latest = {}
+                for record in self.iter_records():
+                    latest.pop(key(record), None)  # Re-insert, so the order follows the last occurrence
+                    latest[key(record)] = record
+                records = latest.values()
+
+            with atomic_write(self.path, "wb") as f:
+                for record in records:
+                    f.write(self.codec.dumps(record) + b"\n")
+            self._checked_tail = True
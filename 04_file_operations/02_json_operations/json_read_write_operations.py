@@ -1,12 +1,21 @@
-import json
 from pathlib import Path
 
+from json_codec import get_codec
+from json_stream import iter_json_array
+
 names = ["Sanjeet","Nikhil", "Manish", "Sujeet"]
+# import json
 # with Path.open("names.json","w") as file:
 #     contents = json.dumps(names)
 #     file.write(contents)
-    
-with Path.open("names.json","r") as file:
+
+# Read the raw bytes and let the fastest installed JSON library decode them
+with Path.open("names.json","rb") as file:
     content = file.read()
-    contents = json.loads(content)
-    print(contents[0])
\ No newline at end of file
+    contents = get_codec().loads(content)
+    print(contents[0])
+
+# Only the beginning of the file is read to get the first name, so this works
+# the same for a file with four names or with a hundred million
+first_name = next(iter_json_array("names.json"))
+print(first_name)
@@ -0,0 +1,92 @@
+"""Read the elements of a huge JSON list one at a time.
+
+json.load() builds the whole list in memory at once, on top of the text of
+the file. iter_json_array() reads the file in small chunks instead and hands
+out each element as soon as it is complete, so memory stays around one chunk
+plus one element no matter how big the file is:
+
+    for name in iter_json_array("names_data.json"):
+        print(name)
+"""
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+# Same trick as the json module itself: one regex call skips a whole run of whitespace
+_skip_whitespace = re.compile(r"[ \t\n\r]*").match
+# What may follow a list element; anything else means the element goes on in the next chunk
+_DELIMITERS = " \t\n\r,]}"
+
+# The built-in decoder can parse one value starting anywhere in a string (raw_decode);
+# the faster optional libraries in json_codec.py can only parse whole documents
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """Decoded text of the file that has been read but not handed out yet."""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()  # also skips a byte order mark
+        self.text = ""
+        self.position = 0
+        self.at_end = False
+
+    def read_more(self, size=None):
+        """Add the next chunk of the file; returns False once the file is used up."""
+        if self.at_end:
+            return False
+        data = self.file.read(size or self.chunk_size)
+        self.at_end = not data
+        # Drop what was handed out already, so the text does not grow with the file
+        self.text = self.text[self.position:] + self.decoder.decode(data, final=self.at_end)
+        self.position = 0
+        return True
+
+    def next_char(self):
+        """Skip whitespace and return the next character ("" at the end of the file)."""
+        while True:
+            self.position = _skip_whitespace(self.text, self.position).end()
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not self.read_more():
+                return ""
+
+    def decode_value(self):
+        """Parse the JSON value that starts at the next non-whitespace character."""
+        self.next_char()  # raw_decode does not skip whitespace itself
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.position)
+                # A number cut by the chunk edge still parses ("12" of "1234", "1" of "1.5"),
+                # so only accept a value that is followed by a delimiter or the end of the file
+                if self.at_end or (end < len(self.text) and self.text[end] in _DELIMITERS):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.at_end:
+                    raise
+            # The value is not complete yet. Read at least as much as we already have,
+            # so a value spanning many chunks is re-parsed only a few times
+            self.read_more(max(self.chunk_size, len(self.text) - self.position))
+
+
+def iter_json_array(file_name, chunk_size=CHUNK_SIZE):
+    """Yield the elements of the JSON list stored in file_name, one at a time."""
+    with open(file_name, "rb") as f:
+        buffer = _Buffer(f, chunk_size)
+        if buffer.next_char() != "[":
+            raise ValueError(f"{file_name} does not contain a JSON list")
+        buffer.position += 1
+        if buffer.next_char() == "]":
+            return
+        while True:
+            yield buffer.decode_value()
+            separator = buffer.next_char()
+            buffer.position += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"{file_name}: expected ',' or ']' in the list, found {separator or 'end of file'!r}")
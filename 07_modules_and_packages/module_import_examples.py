@@ -27,7 +27,9 @@
 # print(book)
 # ebook.describe_book()
 # -------------------------------------------------
+import sys
 from pathlib import Path
+
 content = "Hey, there\n"
 content += "Welcome to the world of Python\n"
 content += "Python ❤️"
@@ -37,9 +39,15 @@ def readfile(file_name):
         return []
     return path.read_text(encoding='utf-8')
 
-def write_to_file(filename, content):
-    path = Path(filename)
-    return path.write_text(content, encoding="utf-8")
+def write_to_file(filename, content, lock=False):
+    # atomic_write.py lives in another folder, which is not on the import path. Adding
+    # it here, only when this function runs, keeps importing this file free of side effects.
+    helpers = str(Path(__file__).resolve().parent.parent / "04_file_operations" / "02_json_operations")
+    if helpers not in sys.path:
+        sys.path.append(helpers)
+    from atomic_write import write_text_atomic
+    # Unlike path.write_text(), this never leaves a half-written file behind
+    return write_text_atomic(filename, content, encoding="utf-8", lock=lock)
 
 # print(readfile("example.txt"))
 # write_to_file("command.txt",content=content)
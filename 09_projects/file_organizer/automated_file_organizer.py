@@ -1,29 +1,778 @@
+import ctypes
+import ctypes.util
+import hashlib
+import json
 import os
-import shutil
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def organize_directory(path):
-    
-    for file in os.listdir(path):
-        if os.path.isdir(os.path.join(path, file)):
+# Folder for files that have no extension
+OTHERS_DIR = "Others"
+# Number of moves handed to a worker thread at once
+MOVE_BATCH_SIZE = 500
+# Move plan and progress of the current run, kept in the organized directory
+JOURNAL_NAME = ".organizer_journal.jsonl"
+# Make the journal durable on disk after this many finished moves
+JOURNAL_SYNC_EVERY = 1000
+# Runs that resume a plan whose moves keep failing before that plan is given up.
+# Each later run then scans again, so a stuck move never holds back new files.
+MAX_RESUMES = 1
+# Where duplicates go with dedup="quarantine"
+DUPLICATES_DIR = "Duplicates"
+# What to do with a file that is byte-identical to one that is kept:
+# replace it with a hard link, leave it where it is, or move it to DUPLICATES_DIR
+DEDUP_MODES = ("hardlink", "skip", "quarantine")
+# Bytes hashed to tell apart files of the same size before hashing them in full
+PARTIAL_HASH_SIZE = 64 * 1024
+# Cache of content-detected file types, kept in the organized directory
+INDEX_NAME = ".organizer_index.json"
+# Names of the top-level folders the organizer has moved files into
+FOLDERS_NAME = ".organizer_folders.json"
+# Most entries kept in the index; the least recently used ones are dropped first
+INDEX_MAX_ENTRIES = 100_000
+# Bytes read from the start of a file to recognise its type (tar needs 262)
+HEADER_SIZE = 264
+
+# Magic numbers: (offset, bytes, type). The type is also the folder name.
+SIGNATURES = [
+    (0, b"\xff\xd8\xff", "JPG"),
+    (0, b"\x89PNG\r\n\x1a\n", "PNG"),
+    (0, b"GIF87a", "GIF"),
+    (0, b"GIF89a", "GIF"),
+    (0, b"II*\x00", "TIF"),
+    (0, b"MM\x00*", "TIF"),
+    (8, b"WEBP", "WEBP"),
+    (8, b"WAVE", "WAV"),
+    (8, b"AVI ", "AVI"),
+    (4, b"ftyp", "MP4"),
+    (0, b"ID3", "MP3"),
+    (0, b"OggS", "OGG"),
+    (0, b"fLaC", "FLAC"),
+    (0, b"%PDF-", "PDF"),
+    (0, b"PK\x03\x04", "ZIP"),
+    (0, b"\x1f\x8b", "GZ"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7Z"),
+    (0, b"Rar!\x1a\x07", "RAR"),
+    (257, b"ustar", "TAR"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "DOC"),
+    (0, b"SQLite format 3\x00", "SQLITE"),
+    (0, b"\x7fELF", "ELF"),
+    (0, b"MZ", "EXE"),
+    (0, b"BM", "BMP"),
+]
+# Extensions that are already correct for a detected type; such files keep
+# their extension folder (a .docx is a ZIP inside, but should stay in DOCX)
+MATCHING_EXTENSIONS = {
+    "JPG": {"JPG", "JPEG", "JPE", "JFIF"},
+    "TIF": {"TIF", "TIFF", "DNG", "NEF", "CR2", "ARW"},
+    "MP4": {"MP4", "M4A", "M4V", "MOV", "3GP", "HEIC", "HEIF", "AVIF"},
+    "OGG": {"OGG", "OGA", "OGV", "OPUS"},
+    "ZIP": {"ZIP", "DOCX", "XLSX", "PPTX", "ODT", "ODS", "ODP", "JAR", "APK", "EPUB", "WHL", "XPI"},
+    "GZ": {"GZ", "TGZ"},
+    "DOC": {"DOC", "XLS", "PPT", "MSG", "MSI"},
+    "SQLITE": {"SQLITE", "SQLITE3", "DB"},
+    "ELF": {"SO", "O", "BIN"},
+    "EXE": {"EXE", "DLL", "SYS", "SCR"},
+}
+# Extensions the tables above know about. Content only overrides one of these
+# (or a missing extension): a short magic number like "BM" or "MZ" also starts
+# plenty of text files, and many formats (.xlsm, .cbz, ...) are ZIPs inside.
+KNOWN_EXTENSIONS = {file_type for offset, magic, file_type in SIGNATURES}.union(*MATCHING_EXTENSIONS.values())
+
+def folder_for(file):
+    """Name of the folder a file belongs in: its extension in upper case."""
+    filename, file_extension = os.path.splitext(file)
+    return file_extension[1:].upper() or OTHERS_DIR
+
+def detect_type(header):
+    """File type from the first bytes of a file, or None if it is not recognised."""
+    for offset, magic, file_type in SIGNATURES:
+        if header.startswith(magic, offset):
+            return file_type
+    return None
+
+class ContentClassifier:
+    """Picks folders by file content (magic numbers) instead of by extension alone.
+
+    Only the first HEADER_SIZE bytes of a file are read, and the detected type
+    is cached in a JSON index keyed on (inode, size, mtime). Files that are
+    scanned again by a later run (duplicates left in place by dedup="skip",
+    moves that failed, or a dry run's plan discarded for other options) are
+    then looked up instead of read.
+    Content only decides for files without an extension, or with an extension
+    from the signature tables that the content contradicts (a PNG named .jpg).
+    Everything else is classified by extension as usual.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._index = {}
+        # Only rewrite the index when this run detected something new
+        self._changed = False
+
+    def _detected_type(self, entry):
+        stat = entry.stat()
+        key = f"{entry.inode()}:{stat.st_size}:{stat.st_mtime_ns}"
+        file_type = self._index.pop(key, None)
+        if file_type is None:
+            try:
+                with open(entry.path, "rb") as f:
+                    file_type = detect_type(f.read(HEADER_SIZE)) or ""
+            except OSError:
+                file_type = ""
+            self._changed = True
+        # Re-inserted at the end, so the dict stays in least-recently-used order.
+        # Single dict operations, so this is safe from several threads.
+        self._index[key] = file_type
+        return file_type
+
+    def folder_for(self, entry):
+        folder = folder_for(entry.name)
+        if folder != OTHERS_DIR and folder not in KNOWN_EXTENSIONS:
+            return folder  # Content can't tell us anything better about a .txt or .xlsm
+        file_type = self._detected_type(entry)
+        if not file_type or folder == file_type or folder in MATCHING_EXTENSIONS.get(file_type, ()):
+            return folder
+        return file_type
+
+    def save(self):
+        """Write the index back, merged with this run's detections, if anything new was found."""
+        if not self._changed:
+            return
+        entries = list(self._index.items())[-INDEX_MAX_ENTRIES:]
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(entries), f)
+        os.replace(temp_path, self.index_path)
+        self._changed = False
+
+def load_organizer_folders(path):
+    """Top-level folders of path that the organizer moved files into (plus DUPLICATES_DIR)."""
+    try:
+        with open(os.path.join(path, FOLDERS_NAME), "r", encoding="utf-8") as f:
+            folders = set(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        folders = set()
+    # Quarantined duplicates must never be sorted back out of it
+    folders.add(DUPLICATES_DIR)
+    return folders
+
+def _save_organizer_folders(path, folders):
+    folders = sorted(folders - {DUPLICATES_DIR})
+    temp_path = os.path.join(path, FOLDERS_NAME + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(folders, f)
+    os.replace(temp_path, os.path.join(path, FOLDERS_NAME))
+
+def _iter_files(path, recursive, only=None, skip_dirs=()):
+    """Yield (directory relative to path, DirEntry) for every file to organize.
+
+    If only is a set of names, top-level entries with other names are ignored.
+    With recursive=True, the top-level folders named in skip_dirs are not entered.
+    """
+    pending_dirs = [""]
+    while pending_dirs:
+        relative_dir = pending_dirs.pop()
+        with os.scandir(os.path.join(path, relative_dir)) as entries:
+            for entry in entries:
+                if only is not None and relative_dir == "" and entry.name not in only:
+                    continue
+                if entry.is_dir():
+                    # Sub-folders are organized too, except the target folders themselves
+                    if recursive and not (relative_dir == "" and entry.name in skip_dirs):
+                        pending_dirs.append(os.path.join(relative_dir, entry.name))
+                elif not (relative_dir == "" and entry.name in (JOURNAL_NAME, INDEX_NAME, FOLDERS_NAME)):
+                    yield relative_dir, entry
+
+def _unique_name(name, taken):
+    """name, or "name (1).ext", "name (2).ext", ... if it is already used in the target folder."""
+    if name not in taken:
+        return name
+    stem, extension = os.path.splitext(name)
+    number = 1
+    while f"{stem} ({number}){extension}" in taken:
+        number += 1
+    return f"{stem} ({number}){extension}"
+
+def _classify_batch(classifier, batch):
+    return [(relative_dir, entry, classifier.folder_for(entry)) for relative_dir, entry in batch]
+
+def _classified_files(path, recursive, classifier, workers, only, skip_dirs):
+    """Yield (directory relative to path, DirEntry, target folder) for every file to organize."""
+    if classifier is None:
+        for relative_dir, entry in _iter_files(path, recursive, only, skip_dirs):
+            yield relative_dir, entry, folder_for(entry.name)
+        return
+    # Reading file headers is I/O bound, so spread it over a thread pool
+    files = list(_iter_files(path, recursive, only, skip_dirs))
+    batches = [files[start:start + MOVE_BATCH_SIZE] for start in range(0, len(files), MOVE_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch in executor.map(_classify_batch, [classifier] * len(batches), batches):
+            yield from batch
+
+def _hash_file(file_path, limit=None):
+    """SHA-256 of the first `limit` bytes of a file (all of it if limit is None), or None if it can't be read."""
+    digest = hashlib.sha256()
+    remaining = limit
+    try:
+        with open(file_path, "rb") as f:
+            while remaining is None or remaining > 0:
+                block = f.read(1024 * 1024 if remaining is None else min(remaining, 1024 * 1024))
+                if not block:
+                    break
+                digest.update(block)
+                if remaining is not None:
+                    remaining -= len(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def _split_by_hash(groups, limit, executor):
+    """Split each (size, [paths]) group by file hash, keeping only groups that still have 2+ files."""
+    paths = [file_path for size, group in groups for file_path in group]
+    digests = dict(zip(paths, executor.map(_hash_file, paths, [limit] * len(paths))))
+    result = []
+    for size, group in groups:
+        by_digest = {}
+        for file_path in group:
+            if digests[file_path] is not None:
+                by_digest.setdefault(digests[file_path], []).append(file_path)
+        result.extend((size, same) for same in by_digest.values() if len(same) > 1)
+    return result
+
+def find_duplicates(files, workers=8):
+    """Group byte-identical files. files is a list of (path, size).
+
+    Files are grouped by size first, and only files that share a size are
+    ever read: first their opening PARTIAL_HASH_SIZE bytes, then, if those
+    match too, the whole file. Hashing runs on a pool of `workers` threads.
+    Returns the groups of identical paths (2+ each, in input order).
+    """
+    by_size = {}
+    for file_path, size in files:
+        if size > 0:  # All empty files are "identical"; leave them alone
+            by_size.setdefault(size, []).append(file_path)
+    groups = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        groups = _split_by_hash(groups, PARTIAL_HASH_SIZE, executor)
+        # Files no bigger than PARTIAL_HASH_SIZE have already been hashed in full
+        small = [group for group in groups if group[0] <= PARTIAL_HASH_SIZE]
+        large = [group for group in groups if group[0] > PARTIAL_HASH_SIZE]
+        groups = small + _split_by_hash(large, None, executor)
+    return [paths for size, paths in groups]
+
+def _dedup_moves(path, moves, sizes, existing, dedup, taken, workers):
+    """Apply the dedup mode to planned moves whose file duplicates another file.
+
+    existing lists (path, size) of files already in the target folders; those
+    are never touched, but count as the copy to keep. Otherwise the first
+    planned copy is kept and moved as usual.
+    """
+    owner = {os.path.join(path, source): index for index, (source, target, link) in enumerate(moves)}
+    files = [(os.path.join(path, relative), size) for relative, size in existing]
+    files += [(os.path.join(path, source), sizes[source]) for source, target, link in moves]
+    duplicates = {}
+    for group in find_duplicates(files, workers):
+        keep = group[0]
+        # Where the kept copy will be once the plan has run, relative to path
+        keep_at = moves[owner[keep]][1] if keep in owner else os.path.relpath(keep, path)
+        for file_path in group[1:]:
+            if file_path in owner:
+                duplicates[owner[file_path]] = keep_at
+
+    if dedup == "quarantine" and duplicates and DUPLICATES_DIR not in taken:
+        quarantine_dir = os.path.join(path, DUPLICATES_DIR)
+        taken[DUPLICATES_DIR] = set(os.listdir(quarantine_dir)) if os.path.isdir(quarantine_dir) else set()
+    deduped = []
+    for index, (source, target, link) in enumerate(moves):
+        if index not in duplicates:
+            deduped.append((source, target, link))
+        elif dedup == "hardlink":
+            deduped.append((source, target, duplicates[index]))
+        elif dedup == "quarantine":
+            name = _unique_name(os.path.basename(source), taken[DUPLICATES_DIR])
+            taken[DUPLICATES_DIR].add(name)
+            deduped.append((source, os.path.join(DUPLICATES_DIR, name), None))
+        # dedup == "skip": the duplicate stays where it is
+    print(f"Found {len(duplicates)} duplicate files ({dedup})")
+    return deduped
+
+def plan_moves(path, recursive=False, classifier=None, workers=8, dedup=None, only=None, skip_dirs=None):
+    """Scan path once and list the moves that organize it, relative to path.
+
+    Each move is (source, target, link). link is None for a plain move; for a
+    duplicate in dedup="hardlink" mode it is the file that target should
+    become a hard link to (the source file is then deleted).
+
+    Each target folder is listed once so that files never overwrite each other:
+    a name that is already taken gets a " (1)" style suffix. Pass a
+    ContentClassifier to choose folders by file content, and one of
+    DEDUP_MODES to handle byte-identical files (see find_duplicates).
+    only limits the plan to the given top-level names. With recursive=True,
+    the top-level folders in skip_dirs (default: load_organizer_folders(path))
+    are left alone; a file already in its target folder never moves.
+    """
+    if dedup is not None and dedup not in DEDUP_MODES:
+        raise ValueError(f"dedup must be one of {DEDUP_MODES}, not {dedup!r}")
+    if skip_dirs is None:
+        skip_dirs = load_organizer_folders(path)
+    moves = []
+    taken = {}
+    # Only needed for dedup: file sizes, and the files already in the target folders
+    sizes, existing = {}, []
+    for relative_dir, entry, directory in _classified_files(path, recursive, classifier, workers, only, skip_dirs):
+        if relative_dir == directory:
+            continue  # e.g. a.jpg in a JPG folder made before its name was recorded
+        if directory not in taken:
+            taken[directory] = set()
+            target_dir = os.path.join(path, directory)
+            if os.path.isdir(target_dir):
+                with os.scandir(target_dir) as entries:
+                    for existing_entry in entries:
+                        taken[directory].add(existing_entry.name)
+                        if dedup and existing_entry.is_file():
+                            existing.append((os.path.join(directory, existing_entry.name),
+                                             existing_entry.stat().st_size))
+        name = _unique_name(entry.name, taken[directory])
+        taken[directory].add(name)
+        source = os.path.join(relative_dir, entry.name)
+        moves.append((source, os.path.join(directory, name), None))
+        if dedup:
+            sizes[source] = entry.stat().st_size
+    if dedup:
+        moves = _dedup_moves(path, moves, sizes, existing, dedup, taken, workers)
+    return moves
+
+class MoveJournal:
+    """Write-ahead log of an organize run, stored as JSON Lines in the organized directory.
+
+    The file holds one {"src", "dst"[, "link"]} line per planned move, then a
+    {"planned": count, "options": {...}} line once the plan is complete, then a
+    {"done": index} line for every move that has finished and a {"resumed": 1}
+    line for every run that picked the plan up again. With it an interrupted
+    run can be resumed, or rolled back, without scanning the directory again.
+    """
+
+    def __init__(self, path):
+        self.file_path = os.path.join(path, JOURNAL_NAME)
+        self._file = None
+        self._lock = threading.Lock()
+        self._unsynced = 0
+
+    def write_plan(self, moves, options=None):
+        # Write to a temporary file first so a crash never leaves half a plan behind
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for source, target, link in moves:
+                record = {"src": source, "dst": target}
+                if link is not None:
+                    record["link"] = link
+                f.write(json.dumps(record) + "\n")
+            f.write(json.dumps({"planned": len(moves), "options": options}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.file_path)
+
+    def load(self):
+        """Return (moves, set of finished move indexes, plan options, times resumed),
+        or None if there is no complete plan."""
+        moves, done, options, resumes, planned = [], set(), None, 0, False
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # A checkpoint cut off by a crash
+                    if "done" in record:
+                        done.add(record["done"])
+                    elif "resumed" in record:
+                        resumes += 1
+                    elif "planned" in record:
+                        planned = True
+                        options = record.get("options")
+                    else:
+                        moves.append((record["src"], record["dst"], record.get("link")))
+        except FileNotFoundError:
+            return None
+        return (moves, done, options, resumes) if planned else None
+
+    def _append(self, record):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.file_path, "a", encoding="utf-8")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            return self._file
+
+    def mark_resumed(self):
+        """Record that a run picked the plan up again."""
+        os.fsync(self._append({"resumed": 1}).fileno())
+
+    def mark_done(self, index):
+        """Checkpoint a finished move. Safe to call from several threads."""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.file_path, "a", encoding="utf-8")
+            self._file.write(json.dumps({"done": index}) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= JOURNAL_SYNC_EVERY:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        os.remove(self.file_path)
+
+def _replace_with_link(source_path, target_path, link_path):
+    """Make target_path a hard link to link_path, then delete the duplicate at source_path."""
+    try:
+        os.link(link_path, target_path)
+    except FileExistsError:
+        # Linked by a run that crashed before it deleted the source
+        if not os.path.samefile(link_path, target_path):
+            raise
+    os.remove(source_path)
+
+def _move_batch(path, batch, journal):
+    """Run a batch of (index, source, target, link) moves.
+
+    Returns (list of (file, error) for the failures, list of files that no longer exist).
+    """
+    errors, missing = [], []
+    for index, source, target, link in batch:
+        source_path = os.path.join(path, source)
+        try:
+            if link is None:
+                os.rename(source_path, os.path.join(path, target))
+            else:
+                _replace_with_link(source_path, os.path.join(path, target), os.path.join(path, link))
+        except FileNotFoundError as error:
+            if os.path.exists(source_path):
+                errors.append((source, str(error)))
+                continue
+            # Source gone: either already moved by a run that crashed before it could
+            # checkpoint, or deleted since the plan was made. Nothing is left to do.
+            if not os.path.exists(os.path.join(path, target)):
+                missing.append(source)
+        except OSError as error:
+            errors.append((source, str(error)))
             continue
-        
-        filename, file_extension = os.path.splitext(file)
-        directory = file_extension[1:].upper()
-        
-        if not directory:
-            directory = "Others"
-        
-        new_dir_path = os.path.join(path, directory)
-        os.makedirs(new_dir_path, exist_ok=True)
-        
-        shutil.move(src=os.path.join(path, file), dst=os.path.join(new_dir_path, file))
-        print(f"Moved {file} --> {new_dir_path}")
-        
+        journal.mark_done(index)
+    return errors, missing
+
+def _batches(moves, done, batch_size, links):
+    """Batches of unfinished moves: plain moves, or (links=True) the hard-link moves."""
+    batch = []
+    for index, (source, target, link) in enumerate(moves):
+        if index in done or (link is not None) != links:
+            continue
+        batch.append((index, source, target, link))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _count_by_folder(moves):
+    counts = {}
+    for source, target, link in moves:
+        directory = os.path.dirname(target)
+        counts[directory] = counts.get(directory, 0) + 1
+    return counts
+
+def print_summary(report):
+    total = sum(report["moved"].values())
+    print(f"Moved {total} files into {len(report['moved'])} folders")
+    for directory, count in sorted(report["moved"].items()):
+        print(f"  {directory}: {count}")
+    if report.get("missing"):
+        print(f"Skipped {len(report['missing'])} files that no longer exist")
+    if report.get("skipped_folders"):
+        print(f"Left alone {len(report['skipped_folders'])} folders made by the organizer: "
+              + ", ".join(report["skipped_folders"]))
+    if report["errors"]:
+        print(f"Failed to move {len(report['errors'])} files:")
+        for file, error in report["errors"]:
+            print(f"  {file}: {error}")
+
+def organize_directory(path, workers=8, recursive=False, dry_run=False, classify_content=False, dedup=None,
+                       only=None):
+    """Move every file in path into a folder named after its extension.
+
+    The directory is scanned once and the resulting plan is written to a journal
+    file (JOURNAL_NAME) before anything moves. Each target folder is created
+    once and the moves run on a pool of `workers` threads, each checkpointed in
+    the journal. If a journal from an interrupted run made with the same
+    options is found, that plan is finished first and the directory is then
+    scanned for anything new; use rollback_directory() to undo it instead.
+    A plan made with other options is discarded, and one whose moves still
+    fail after MAX_RESUMES resumed runs is given up.
+
+    recursive=True also organizes files in sub-folders (into the top-level
+    extension folders), except in the folders the organizer itself moved files
+    into (recorded in FOLDERS_NAME) and DUPLICATES_DIR; those are listed in the
+    summary. dry_run=True only writes and prints the plan.
+    classify_content=True sorts by the file's real type (see ContentClassifier),
+    so extensionless or mislabeled files don't all end up in "Others".
+    dedup ("hardlink", "skip" or "quarantine") handles files that are
+    byte-identical to another file being organized or already organized.
+    only limits the run to the given top-level names (used by watch_directory).
+
+    Returns a report {"moved": {folder: count}, "errors": [(file, error)], "missing": [file],
+    "skipped_folders": [folder]} and prints a summary.
+    """
+    options = {"recursive": recursive, "classify_content": classify_content, "dedup": dedup,
+               "only": None if only is None else sorted(only)}
+    organizer_folders = load_organizer_folders(path)
+    skipped_folders = []
+    if recursive:
+        skipped_folders = sorted(name for name in organizer_folders
+                                 if (only is None or name in only) and os.path.isdir(os.path.join(path, name)))
+    journal = MoveJournal(path)
+    saved_plan = journal.load()
+    resumed = False
+    if saved_plan is not None and saved_plan[2] != options:
+        print("Discarding the plan of an earlier run that used different options")
+        journal.remove()
+        saved_plan = None
+    if saved_plan is None:
+        classifier = ContentClassifier(os.path.join(path, INDEX_NAME)) if classify_content else None
+        moves, done = plan_moves(path, recursive, classifier, workers, dedup, only, organizer_folders), set()
+        journal.write_plan(moves, options)
+        if classifier is not None:
+            classifier.save()
+    else:
+        moves, done, _, resumes = saved_plan
+        if dry_run:
+            print(f"An earlier run is unfinished: {len(done)} of {len(moves)} moves already done")
+        else:
+            print(f"Resuming an earlier run: {len(done)} of {len(moves)} moves already done")
+            journal.mark_resumed()
+            resumed = True
+
+    if dry_run:
+        print(f"Planned {len(moves)} moves (written to {journal.file_path}):")
+        for directory, count in sorted(_count_by_folder(moves).items()):
+            print(f"  {directory}: {count}")
+        return {"moved": {}, "errors": [], "missing": [], "skipped_folders": skipped_folders}
+
+    target_dirs = {os.path.dirname(target) for source, target, link in moves}
+    for directory in target_dirs:
+        try:
+            os.makedirs(os.path.join(path, directory), exist_ok=True)
+        except OSError as error:
+            # e.g. a file with the folder's name; the moves into it fail and are reported
+            print(f"Could not create {directory}: {error}")
+    # Remembered before anything moves, so a crashed run's folders are skipped too
+    created = {directory for directory in target_dirs if os.path.isdir(os.path.join(path, directory))}
+    if not created <= organizer_folders:
+        _save_organizer_folders(path, organizer_folders | created)
+
+    report = {"moved": {}, "errors": [], "missing": [], "skipped_folders": skipped_folders}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Hard links point at kept files that may still be moving, so they go last
+            for links in (False, True):
+                futures = [executor.submit(_move_batch, path, batch, journal)
+                           for batch in _batches(moves, done, MOVE_BATCH_SIZE, links)]
+                for future in futures:
+                    errors, missing = future.result()
+                    report["errors"].extend(errors)
+                    report["missing"].extend(missing)
+    finally:
+        journal.close()
+
+    skipped = {source for source, error in report["errors"]} | set(report["missing"])
+    report["moved"] = _count_by_folder(
+        move for index, move in enumerate(moves) if index not in done and move[0] not in skipped)
+    # Keep the journal while moves are still failing, so the next run retries them,
+    # but not forever: a move that can never succeed must not block every later run
+    if not report["errors"]:
+        journal.remove()
+    elif resumed and resumes + 1 >= MAX_RESUMES:
+        print(f"Giving up on the earlier plan; {len(report['errors'])} moves in it keep failing")
+        journal.remove()
+
+    print_summary(report)
+    if resumed and not os.path.exists(journal.file_path):
+        # The old plan is finished; now organize whatever it did not cover
+        fresh = organize_directory(path, workers, recursive, dry_run, classify_content, dedup, only)
+        for directory, count in fresh["moved"].items():
+            report["moved"][directory] = report["moved"].get(directory, 0) + count
+        report["errors"].extend(fresh["errors"])
+        report["missing"].extend(fresh["missing"])
+    return report
+
+def rollback_directory(path):
+    """Undo the finished moves of an interrupted (or dry-run) organize run and drop its journal."""
+    journal = MoveJournal(path)
+    saved_plan = journal.load()
+    if saved_plan is None:
+        print("Nothing to roll back")
+        return 0
+    moves, done, _, _ = saved_plan
+    restored = 0
+    # Undo in reverse order, so renamed duplicates free their names in the right order
+    for index in range(len(moves) - 1, -1, -1):
+        # A hard-linked duplicate is moved back as is (still linked to the kept copy)
+        source, target, link = moves[index]
+        source_path, target_path = os.path.join(path, source), os.path.join(path, target)
+        # A move may have happened just before a crash, without its checkpoint
+        if index not in done and (os.path.exists(source_path) or not os.path.exists(target_path)):
+            continue
+        os.makedirs(os.path.dirname(source_path), exist_ok=True)
+        try:
+            os.rename(target_path, source_path)
+            restored += 1
+        except OSError as error:
+            print(f"Could not move {target} back: {error}")
+    # Remove target folders that are empty again
+    removed = set()
+    for directory in {os.path.dirname(target) for source, target, link in moves}:
+        try:
+            os.rmdir(os.path.join(path, directory))
+            removed.add(directory)
+        except OSError:
+            pass  # Not empty, or never created
+    organizer_folders = load_organizer_folders(path)
+    if removed & organizer_folders:
+        _save_organizer_folders(path, organizer_folders - removed)
+    journal.remove()
+    print(f"Moved {restored} files back")
+    return restored
+
+# Files the organizer itself writes in the watched directory; they never trigger a run
+_OWN_FILES = {JOURNAL_NAME, INDEX_NAME, FOLDERS_NAME, JOURNAL_NAME + ".tmp", INDEX_NAME + ".tmp",
+              FOLDERS_NAME + ".tmp"}
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+class InotifyWatcher:
+    """Reports files that were written and closed in, or moved into, a directory (Linux only)."""
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self._fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"inotify_add_watch failed for {path}")
+
+    def changed_names(self, timeout, rescan=False):
+        """Block for up to timeout seconds; return the names of files that changed."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+        names = set()
+        offset = 0
+        # Each event is a struct inotify_event: int wd; uint32 mask, cookie, len; char name[len]
+        while offset < len(data):
+            wd, mask, cookie, length = struct.unpack_from("iIII", data, offset)
+            offset += struct.calcsize("iIII")
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self._fd)
+
+class PollingWatcher:
+    """Fallback watcher: checks the directory's mtime every poll and only lists it
+    again when the mtime moved, or while files are still settling (rescan=True)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        # (size, mtime) of every top-level file at the last listing
+        self._files = {}
+
+    def changed_names(self, timeout, rescan=False):
+        time.sleep(timeout)
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime and not rescan:
+            return set()
+        self._mtime = mtime
+        files = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        changed = {name for name, signature in files.items() if self._files.get(name) != signature}
+        self._files = files
+        return changed
+
+    def close(self):
+        pass
+
+def watch_directory(path, interval=2.0, debounce=1.0, stop_event=None, **options):
+    """Keep organizing path as new files arrive, until stop_event is set (or Ctrl+C).
+
+    Uses inotify on Linux and PollingWatcher elsewhere, so an idle folder costs
+    (almost) nothing. A file is organized once it has not changed for `debounce`
+    seconds, which keeps bursts of writes from moving half-written files.
+    Only the top level of path is watched; options go to organize_directory().
+    """
+    # Start watching before the first organize run, so files that arrive during it are seen
+    watcher = None
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(path)
+        except OSError as error:
+            print(f"inotify unavailable ({error}), polling every {interval}s instead")
+    if watcher is None:
+        watcher = PollingWatcher(path)
+        watcher.changed_names(0)  # Remember what is already there; the run below handles it
+    organize_directory(path, **options)
+
+    # Name -> time it last changed, for files waiting to settle
+    pending = {}
+    try:
+        while stop_event is None or not stop_event.is_set():
+            timeout = min(interval, debounce) if pending else interval
+            for name in watcher.changed_names(timeout, rescan=bool(pending)) - _OWN_FILES:
+                pending[name] = time.monotonic()
+            now = time.monotonic()
+            settled = {name for name, changed in pending.items() if now - changed >= debounce}
+            if settled:
+                for name in settled:
+                    del pending[name]
+                organize_directory(path, only=settled, **options)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        watcher.close()
+
 def main():
     r""" When you prefix a string with r, Python treats it as a "raw string" - it doesn't interpret backslashes (\) as escape characters.
     Without r (regular string): Python sees \U and tries to interpret it as a Unicode escape sequence, causing a SyntaxError.
     """
     organize_directory(r"C:\Users\sanjeekumar\Documents\Test")
-    
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,170 @@
+# Benchmark for watermark_images.py
+#
+# Generates a synthetic set of JPEG, PNG and BMP images, runs the watermark
+# tool over them in serial, parallel and pipelined mode (each in a fresh process,
+# so the memory figures are per mode) and prints the results
+# as JSON, so runs before and after a change can be compared.
+#
+# Example:
+#   python benchmark_watermark.py --count 200 --width 1920 --height 1080 --output before.json
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+import watermark_images
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+FORMATS = {"jpeg": ".jpg", "png": ".png", "bmp": ".bmp"}
+
+# Create count images of each requested format in folder; returns the total size in bytes
+def generate_images(folder, count, width, height, formats):
+    os.makedirs(folder, exist_ok=True)
+    # Noise makes the encoders work about as hard as they do on real photos
+    base = Image.merge("RGB", [Image.effect_noise((width, height), sigma) for sigma in (40, 60, 80)])
+    total_bytes = 0
+    for image_format in formats:
+        for number in range(count):
+            path = os.path.join(folder, f"synthetic_{number:05d}{FORMATS[image_format]}")
+            base.save(path)
+            total_bytes += os.path.getsize(path)
+    return total_bytes
+
+# Peak resident memory in MB of this process and of its finished child processes.
+# The peak only ever grows, so call it in a fresh process per measured run (see run_mode_isolated)
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return {"self": round(own, 1), "children": round(children, 1)}
+
+# Wrap a pipeline stage and add the time spent waiting for each item to totals[name].
+# That time includes the stages before it, which stage_timings() subtracts again.
+def _timed(items, name, totals):
+    iterator = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            totals[name] += time.perf_counter() - start
+            return
+        totals[name] += time.perf_counter() - start
+        yield item
+
+# Run the serial pipeline stage by stage and report the seconds spent in each stage
+def stage_timings(input_dir, output_dir, watermark_text, font_size):
+    os.makedirs(output_dir, exist_ok=True)
+    names = ["scan", "decode", "draw", "encode", "write"]
+    totals = dict.fromkeys(names, 0.0)
+    renderer = watermark_images.WatermarkRenderer(watermark_text, font_size)
+    items = _timed(watermark_images.scan_images(input_dir, output_dir), "scan", totals)
+    items = _timed(watermark_images.decode_stage(items), "decode", totals)
+    items = _timed(watermark_images.stamp_stage(items, renderer), "draw", totals)
+    items = _timed(watermark_images.encode_stage(items), "encode", totals)
+    items = _timed(watermark_images.write_stage(items), "write", totals)
+    for _ in items:
+        pass
+    # Each total includes all earlier stages; keep only the stage's own time
+    timings = {}
+    for previous, name in zip([None] + names, names):
+        timings[name] = round(totals[name] - (totals[previous] if previous else 0.0), 4)
+    return timings
+
+def run_mode(mode, input_dir, output_dir, input_bytes, image_count, args):
+    # The tool prints a line per image; keep that out of the measurement
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if mode == "serial":
+            watermark_images.add_watermark_text_to_folder(input_dir, output_dir, args.text, 0, args.font_size)
+        elif mode == "pipelined":
+            watermark_images.add_watermark_text_to_folder_pipelined(input_dir, output_dir, args.text, 0,
+                                                                    args.font_size, read_workers=args.io_workers,
+                                                                    write_workers=args.io_workers)
+        else:
+            watermark_images.add_watermark_text_to_folder_parallel(input_dir, output_dir, args.text, 0, args.font_size,
+                                                                   workers=args.workers, chunk_size=args.chunk_size)
+        seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "seconds": round(seconds, 4),
+        "images_per_sec": round(image_count / seconds, 2),
+        "mb_per_sec": round(input_bytes / seconds / (1024 * 1024), 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+# Run run_mode() in a new process, so its peak_rss_mb is that mode's own and not the
+# highest of every mode run so far (and not inflated by generating the images)
+def run_mode_isolated(mode, input_dir, output_dir, input_bytes, image_count, args):
+    # spawn starts a clean interpreter; a forked child would start with this process's peak
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_mode, mode, input_dir, output_dir, input_bytes, image_count, args).result()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image watermark tool")
+    parser.add_argument("--count", type=int, default=20, help="images per format")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMATS), default=sorted(FORMATS))
+    parser.add_argument("--modes", nargs="+", choices=["serial", "parallel", "pipelined"],
+                        default=["serial", "parallel", "pipelined"])
+    parser.add_argument("--workers", type=int, default=None, help="processes for parallel mode (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=1)
+    parser.add_argument("--io-workers", type=int, default=4, help="reader/writer threads for pipelined mode")
+    parser.add_argument("--text", default="@sanjeet")
+    parser.add_argument("--font-size", type=int, default=32)
+    parser.add_argument("--output", help="write the JSON report to this file instead of printing it")
+    args = parser.parse_args()
+
+    # The tool looks for its font file in the current directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    work_dir = tempfile.mkdtemp(prefix="watermark_benchmark_")
+    try:
+        input_dir = os.path.join(work_dir, "input")
+        input_bytes = generate_images(input_dir, args.count, args.width, args.height, args.formats)
+        image_count = args.count * len(args.formats)
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pillow": Image.__version__,
+            "cpu_count": os.cpu_count(),
+            "images": image_count,
+            "width": args.width,
+            "height": args.height,
+            "formats": args.formats,
+            "input_mb": round(input_bytes / (1024 * 1024), 2),
+            "stage_seconds": stage_timings(input_dir, os.path.join(work_dir, "stages"), args.text, args.font_size),
+            "runs": [],
+        }
+        for mode in args.modes:
+            output_dir = os.path.join(work_dir, f"output_{mode}")
+            report["runs"].append(run_mode_isolated(mode, input_dir, output_dir, input_bytes, image_count, args))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,486 @@
 # Import required modules from PIL (Python Imaging Library) for image manipulation
 from PIL import Image,ImageDraw,ImageFont
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import hashlib
+import io
+import json
 import os
 
-# Define function to add watermark text to all images in a folder
-def add_watermark_text_to_folder(input_dir, output_dir, watermark_text, position, font_size):
+# File extensions (lower-case) that are treated as images
+IMAGE_EXTENSIONS = (".jpg",".jpeg",".png",".bmp")
+# Font used for the watermark text (looked up relative to the current directory)
+DEFAULT_FONT = "super_nought.ttf"
+# File in the output directory that remembers what was already watermarked
+MANIFEST_NAME = "watermark_manifest.json"
+
+# Holds everything that is the same for every image: the loaded font, the
+# measured text size and the pre-rendered text mask. Build it once per run and
+# call apply() on each image, which only stamps the mask at the corner.
+class WatermarkRenderer:
+    def __init__(self, watermark_text, font_size, font_path=DEFAULT_FONT, margin=50, fill="white"):
+        self.watermark_text = watermark_text
+        self.font_size = font_size
+        self.font_path = font_path
+        # Margin distance from image edges (reduced from 100 to 50 pixels)
+        self.margin = margin
+        self.fill = fill
+        # Try to load custom font file, fallback to default if not found
+        try:
+            self.font = ImageFont.truetype(font_path, size=font_size)
+        except OSError:
+            # Handle case when custom font file doesn't exist
+            print("Font file not found, using default font")
+            self.font = ImageFont.load_default()
+
+        # Get bounding box coordinates of the text using font mask
+        # getbbox() returns (x0, y0, x1, y1) - top-left and bottom-right coordinates
+        x0,y0,x1,y1 = self.font.getmask(watermark_text).getbbox()
+        self.text_width = x1-x0
+        self.text_height = y1-y0
+        # Pre-rendered masks keyed by font mode: "L" (anti-aliased) for most
+        # images, "1" for palette and other modes where Pillow draws aliased text.
+        # Each comes with its bbox, the offset of the drawn glyphs from the (x, y)
+        # passed to draw.text(); aliased glyphs can be wider than anti-aliased ones.
+        self._bboxes = {}
+        self._masks = {"L": self._render_mask("L")}
+
+    def _render_mask(self, mode):
+        left, top, right, bottom = self._bboxes[mode] = self.font.getbbox(self.watermark_text, mode=mode)
+        mask = Image.new(mode, (right-left, bottom-top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), self.watermark_text,
+                                  fill=255 if mode == "L" else 1, font=self.font)
+        return mask
+
+    # Top-left (x, y) of the text for an image of the given size: bottom-right corner
+    def position(self, width, height):
+        return width - self.text_width - self.margin, height - self.text_height - self.margin
+
+    # Stamp the watermark onto img in place. Produces the same pixels as
+    # ImageDraw.text() at position(), without laying out the text again.
+    def apply(self, img):
+        draw = ImageDraw.Draw(img)
+        if draw.fontmode not in self._masks:
+            self._masks[draw.fontmode] = self._render_mask(draw.fontmode)
+        x, y = self.position(*img.size)
+        left, top = self._bboxes[draw.fontmode][:2]
+        draw.bitmap((x+left, y+top), self._masks[draw.fontmode], fill=self.fill)
+        return img
+
+# ---------------------------------------------------------------------------
+# Discovery: walk the input directory with os.scandir and yield one task per
+# image as soon as it is found, instead of listing the whole directory first.
+# A task is (input path, output path, os.stat_result); the stat comes from the
+# DirEntry, so no extra stat() call is needed later.
+# ---------------------------------------------------------------------------
+
+def scan_images(input_dir, output_dir, recursive=False):
+    skip_dir = os.path.realpath(output_dir)
+    # Directories still to visit, as (path, path relative to input_dir)
+    pending_dirs = [(input_dir, "")]
+    while pending_dirs:
+        directory, relative_dir = pending_dirs.pop()
+        created_output_dir = False
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # Never descend into our own output directory
+                    if recursive and os.path.realpath(entry.path) != skip_dir:
+                        pending_dirs.append((entry.path, os.path.join(relative_dir, entry.name)))
+                # Check if file is an image by examining its extension (case-insensitive)
+                elif entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                    target_dir = os.path.join(output_dir, relative_dir)
+                    if not created_output_dir:
+                        os.makedirs(target_dir, exist_ok=True)
+                        created_output_dir = True
+                    # Create output file path with "watermark_" prefix
+                    output_path = os.path.join(target_dir, f"watermark_{entry.name}")
+                    yield entry.path, output_path, entry.stat()
+
+# ---------------------------------------------------------------------------
+# Processing pipeline: each stage is a generator that takes items from the
+# previous one, so only one image is in memory at a time:
+#   tasks -> decode -> stamp -> encode -> write
+#
+# max_dimension: if set, images are shrunk so neither side is larger than this.
+#   JPEGs are then decoded at reduced scale (Pillow "draft" mode) and other
+#   formats are reduced by an integer factor before the final resample, so a
+#   large photo never has to be decoded at full size.
+# save_options: extra encoder settings passed to Image.save(), e.g.
+#   {"quality": 85, "optimize": True, "progressive": True, "subsampling": "4:2:0"}
+#   (settings a format does not support are ignored by Pillow)
+# ---------------------------------------------------------------------------
+
+# Decode an image from a path or file object
+def _decode_image(source, max_dimension=None):
+    # Open the image file using PIL; this only reads the header
+    img = Image.open(source)
+    if max_dimension and max(img.size) > max_dimension:
+        # thumbnail() sets up draft mode for JPEGs before decoding, then
+        # uses reduce() + resampling for the rest of the way
+        img.thumbnail((max_dimension, max_dimension))
+    # Decode the pixels right away
+    img.load()
+    return img
+
+# Encode an image to bytes in the format that matches the output file extension
+def _encode_image(img, output_path, save_options=None):
+    # Pick the file format from the output file extension, like Image.save(path) does
+    output_format = Image.registered_extensions()[os.path.splitext(output_path)[1].lower()]
+    buffer = io.BytesIO()
+    img.save(buffer, format=output_format, **(save_options or {}))
+    return buffer.getvalue()
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _write_file(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+def decode_stage(tasks, max_dimension=None):
+    for task in tasks:
+        yield task, _decode_image(task[0], max_dimension)
+
+def stamp_stage(items, renderer):
+    for task, img in items:
+        yield task, renderer.apply(img)
+
+def encode_stage(items, save_options=None):
+    for task, img in items:
+        yield task, _encode_image(img, task[1], save_options)
+
+def write_stage(items):
+    for task, data in items:
+        # Save the watermarked image to the output directory
+        _write_file(task[1], data)
+        yield task
+
+def watermark_pipeline(tasks, renderer, max_dimension=None, save_options=None):
+    decoded = decode_stage(tasks, max_dimension)
+    return write_stage(encode_stage(stamp_stage(decoded, renderer), save_options))
+
+# Draw the watermark on a single image and save it to output_path
+def watermark_image(img_path, output_path, renderer, max_dimension=None, save_options=None):
+    for _ in watermark_pipeline([(img_path, output_path, None)], renderer, max_dimension, save_options):
+        pass
+    return output_path
+
+# Renderer and resize/encoder settings of the current worker process, set once by _init_worker
+_worker_renderer = None
+_worker_options = {}
+
+def _init_worker(watermark_text, font_size, max_dimension, save_options):
+    global _worker_renderer, _worker_options
+    _worker_renderer = WatermarkRenderer(watermark_text, font_size)
+    _worker_options = {"max_dimension": max_dimension, "save_options": save_options}
+
+# Per-image result returned by the parallel and pipelined modes
+def _result(img_path, output_path, error=None):
+    return {"input": img_path, "output": output_path,
+            "error": f"{type(error).__name__}: {error}" if error else None}
+
+# Worker used by the process pool: never raises, reports the error instead
+def _watermark_chunk(chunk):
+    results = []
+    for img_path, output_path in chunk:
+        try:
+            watermark_image(img_path, output_path, _worker_renderer, **_worker_options)
+            results.append(_result(img_path, output_path))
+        except Exception as error:  # e.g. DecompressionBombError: that image fails, not the run
+            results.append(_result(img_path, output_path, error))
+    return results
+
+# Group tasks into lists of chunk_size (input path, output path) pairs
+def _chunks(tasks, chunk_size):
+    chunk = []
+    for img_path, output_path, _ in tasks:
+        chunk.append((img_path, output_path))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ---------------------------------------------------------------------------
+# Incremental mode: the manifest maps every output file (relative to the output
+# directory) to the input it was made from and the watermark settings used:
+#   {"watermark_hero.jpg": {"input": {"size": ..., "mtime_ns": ...}, "params": {...}}}
+# An image is skipped when its input and the settings are unchanged and the
+# output file still exists.
+# ---------------------------------------------------------------------------
+
+# Settings that change what the output looks like; any change re-does the image
+def watermark_params(watermark_text, font_size, position, font_path=DEFAULT_FONT,
+                     max_dimension=None, save_options=None):
+    return {"text": watermark_text, "font": font_path, "font_size": font_size, "position": position,
+            "max_dimension": max_dimension, "save_options": save_options or {}}
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}  # No (or unreadable) manifest: everything gets processed
+
+def save_manifest(output_dir, manifest):
+    # Write to a temporary file first so an interrupted run never leaves half a manifest
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Describe the input file. With hash_contents=True the SHA-256 is recorded as
+# well, but it is only recomputed when size or mtime changed (e.g. a fresh copy)
+def _input_signature(img_path, stat, previous, hash_contents):
+    signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if hash_contents:
+        if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns \
+                and "sha256" in previous:
+            signature["sha256"] = previous["sha256"]
+        else:
+            signature["sha256"] = _file_hash(img_path)
+    return signature
+
+def _is_unchanged(previous_input, signature, hash_contents):
+    if not previous_input or previous_input["size"] != signature["size"]:
+        return False
+    if hash_contents and "sha256" in previous_input:
+        return previous_input["sha256"] == signature["sha256"]
+    return previous_input["mtime_ns"] == signature["mtime_ns"]
+
+# Filters a stream of tasks down to the ones that need work, and builds the
+# new manifest as images are skipped or finished
+class _IncrementalRun:
+    def __init__(self, output_dir, params, hash_contents):
+        self.output_dir = output_dir
+        self.params = params
+        self.hash_contents = hash_contents
+        self.old_manifest = load_manifest(output_dir)
+        self.manifest = {}
+        self.pending_entries = {}
+        self.skipped = 0
+
+    def pending(self, tasks):
+        for img_path, output_path, stat in tasks:
+            key = os.path.relpath(output_path, self.output_dir)
+            previous = self.old_manifest.get(key, {})
+            signature = _input_signature(img_path, stat, previous.get("input"), self.hash_contents)
+            entry = {"input": signature, "params": self.params}
+            if previous.get("params") == self.params and os.path.exists(output_path) \
+                    and _is_unchanged(previous.get("input"), signature, self.hash_contents):
+                self.manifest[key] = entry
+                self.skipped += 1
+            else:
+                self.pending_entries[key] = entry
+                yield img_path, output_path, stat
+
+    # Call once the output for output_path has been written
+    def done(self, output_path):
+        key = os.path.relpath(output_path, self.output_dir)
+        self.manifest[key] = self.pending_entries.pop(key)
+
+    def save(self):
+        print(f"Skipped {self.skipped} unchanged images")
+        save_manifest(self.output_dir, self.manifest)
+
+# Define function to add watermark text to all images in a folder.
+# With incremental=True only new or changed images (or all images, after a
+# change of watermark settings) are processed; see the manifest notes above.
+# With recursive=True sub-folders are processed too, and mirrored in output_dir.
+# max_dimension and save_options are explained with the processing pipeline above.
+def add_watermark_text_to_folder(input_dir, output_dir, watermark_text, position, font_size,
+                                 incremental=False, hash_contents=False, recursive=False,
+                                 max_dimension=None, save_options=None):
     # Check if output directory exists, if not create it
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-        
-    # Loop through all files in the input directory
-    for filename in os.listdir(input_dir):
-        # Check if file is an image by examining its extension (case-insensitive)
-        if filename.lower().endswith((".jpg",".jpeg",".png",".bmp")):
-            # Create full path to the image file by joining directory and filename
-            img_path = os.path.join(input_dir,filename)
-            # Open the image file using PIL
-            original_img = Image.open(img_path)
-            # Get the width and height dimensions of the image
-            width, height = original_img.size
-            # Create a drawing context on the image to add text
-            draw = ImageDraw.Draw(original_img)
-            # Try to load custom font file, fallback to default if not found
-            try:
-                font = ImageFont.truetype("super_nought.ttf", size=font_size)
-                # Print font bounding box and size for debugging
-                print(f"Here is the font: {font.getbbox(watermark_text)}{font.size}")
-            except OSError:
-                # Handle case when custom font file doesn't exist
-                print("Font file not found, using default font")
-                font = ImageFont.load_default()
-            
-            # Print the loaded font name for verification
-            print(f"Here is the font: {font.getname()}")
-            # Get bounding box coordinates of the text using font mask
-            # getbbox() returns (x0, y0, x1, y1) - top-left and bottom-right coordinates
-            x0,y0,x1,y1 = font.getmask(watermark_text).getbbox()
-            # Calculate actual text width by subtracting left from right coordinate
-            text_width = x1-x0
-            # Calculate actual text height by subtracting top from bottom coordinate
-            text_height = y1-y0
-            # Print all dimensions for debugging and verification
-            print(f"image width: {width}, image height: {height}")
-            print(f"text width: {text_width}, text height: {text_height}")
-            
-            # Set margin distance from image edges (reduced from 100 to 50 pixels)
-            margin = 50
-            
-            # Calculate x position: place text near right edge with margin
-            x = width - text_width - margin
-            # Calculate y position: place text near bottom edge with margin
-            y = height - text_height - margin
-            
-            print(f"Calculated position: x={x}, y={y}")
-            
-            # Draw the watermark text on the image at calculated position
-            # Using both fill and stroke for better visibility
-            draw.text((x,y), text=watermark_text, fill="white", font=font)
-            
-            # Create output file path with "watermark_" prefix
-            output_path = os.path.join(output_dir,f"watermark_{filename}")
-            
-            # Save the watermarked image to the output directory
-            original_img.save(output_path)
-            
+
+    tasks = scan_images(input_dir, output_dir, recursive)
+    if incremental:
+        params = watermark_params(watermark_text, font_size, position,
+                                  max_dimension=max_dimension, save_options=save_options)
+        run = _IncrementalRun(output_dir, params, hash_contents)
+        tasks = run.pending(tasks)
+
+    # Load the font and render the text once for the whole folder
+    renderer = WatermarkRenderer(watermark_text, font_size)
+    try:
+        # Images flow through the pipeline one at a time, as they are discovered
+        for img_path, output_path, _ in watermark_pipeline(tasks, renderer, max_dimension, save_options):
+            if incremental:
+                run.done(output_path)
             # Print confirmation message
             print(f"Watermarked image saved as {output_path}")
-            
-            
-# Define input directory path (relative path to current directory)
-input_dir = r".\input_images"
-# Define output directory path (relative path to current directory)
-output_dir = r".\watermarked_images"
-# Set the watermark text to be added to images
-watermark_text = "@sanjeet"
-# Set the font size for the watermark text (reduced from 200 to 32 for better fit)
-font_size = 32
-# Define position variable (note: has typo 'postion' and not actually used in function)
-postion = 0
-# Call the function to process all images, using the font_size variable instead of hardcoded value
-add_watermark_text_to_folder(input_dir, output_dir,watermark_text,position=postion,font_size=font_size)
-            
\ No newline at end of file
+    finally:
+        # Keep the progress made so far, even if an image failed
+        if incremental:
+            run.save()
+
+# Same as add_watermark_text_to_folder, but spreads the images across a process pool.
+# workers=None uses one process per CPU; chunk_size controls how many images are
+# sent to a worker at once (bigger chunks = less overhead for many small images).
+# At most max_pending chunks are queued at once, so huge folders use bounded memory.
+# Returns one result dict per processed image: {"input", "output", "error"}
+def add_watermark_text_to_folder_parallel(input_dir, output_dir, watermark_text, position, font_size,
+                                          workers=None, chunk_size=1, incremental=False, hash_contents=False,
+                                          recursive=False, max_pending=None, max_dimension=None, save_options=None):
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    tasks = scan_images(input_dir, output_dir, recursive)
+    if incremental:
+        params = watermark_params(watermark_text, font_size, position,
+                                  max_dimension=max_dimension, save_options=save_options)
+        run = _IncrementalRun(output_dir, params, hash_contents)
+        tasks = run.pending(tasks)
+
+    workers = workers or os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 4 * workers
+    results = []
+    # Every worker process builds its renderer once, not once per image
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(watermark_text, font_size, max_dimension, save_options)) as executor:
+        futures = deque()
+        try:
+            for chunk in _chunks(tasks, chunk_size):
+                futures.append(executor.submit(_watermark_chunk, chunk))
+                # Wait for the oldest chunk before queueing more work
+                if len(futures) >= max_pending:
+                    results.extend(futures.popleft().result())
+            while futures:
+                results.extend(futures.popleft().result())
+        finally:
+            for result in results:
+                if result["error"]:
+                    print(f"Failed to watermark {result['input']}: {result['error']}")
+                elif incremental:
+                    run.done(result["output"])
+            if incremental:
+                run.save()
+    return results
+
+# Same as add_watermark_text_to_folder, but overlaps file I/O with the image work
+# using threads, for slow (e.g. network) storage:
+#   - read_workers threads read the bytes of up to `prefetch` images ahead
+#   - this thread decodes, stamps and encodes them (Pillow releases the GIL here)
+#   - write_workers threads write the results, with up to `prefetch` writes queued
+# When either queue is full the stage before it waits, so memory stays bounded.
+# Returns one result dict per processed image: {"input", "output", "error"}
+def add_watermark_text_to_folder_pipelined(input_dir, output_dir, watermark_text, position, font_size,
+                                           read_workers=4, write_workers=4, prefetch=16,
+                                           incremental=False, hash_contents=False, recursive=False,
+                                           max_dimension=None, save_options=None):
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    tasks = scan_images(input_dir, output_dir, recursive)
+    if incremental:
+        params = watermark_params(watermark_text, font_size, position,
+                                  max_dimension=max_dimension, save_options=save_options)
+        run = _IncrementalRun(output_dir, params, hash_contents)
+        tasks = run.pending(tasks)
+    tasks = iter(tasks)
+
+    renderer = WatermarkRenderer(watermark_text, font_size)
+    results = []
+    reads, writes = deque(), deque()
+
+    # Keep the readers `prefetch` images ahead of the CPU stage
+    def queue_reads():
+        while len(reads) < prefetch:
+            task = next(tasks, None)
+            if task is None:
+                return
+            reads.append((task, readers.submit(_read_file, task[0])))
+
+    # Wait for the oldest write and record its result
+    def finish_write():
+        task, future = writes.popleft()
+        try:
+            future.result()
+            results.append(_result(task[0], task[1]))
+            if incremental:
+                run.done(task[1])
+        except Exception as error:
+            results.append(_result(task[0], task[1], error))
+
+    with ThreadPoolExecutor(max_workers=read_workers) as readers, \
+            ThreadPoolExecutor(max_workers=write_workers) as writers:
+        try:
+            queue_reads()
+            while reads:
+                task, future = reads.popleft()
+                queue_reads()
+                try:
+                    img = _decode_image(io.BytesIO(future.result()), max_dimension)
+                    data = _encode_image(renderer.apply(img), task[1], save_options)
+                except Exception as error:  # A bad image only fails itself, as in the parallel mode
+                    results.append(_result(task[0], task[1], error))
+                    continue
+                writes.append((task, writers.submit(_write_file, task[1], data)))
+                while len(writes) >= prefetch:
+                    finish_write()
+            while writes:
+                finish_write()
+        finally:
+            for result in results:
+                if result["error"]:
+                    print(f"Failed to watermark {result['input']}: {result['error']}")
+            if incremental:
+                run.save()
+    return results
+
+
+# The process pool re-imports this file in every worker, so the script part
+# must only run when the file is executed directly
+if __name__ == "__main__":
+    # Define input directory path (relative path to current directory)
+    input_dir = r".\input_images"
+    # Define output directory path (relative path to current directory)
+    output_dir = r".\watermarked_images"
+    # Set the watermark text to be added to images
+    watermark_text = "@sanjeet"
+    # Set the font size for the watermark text (reduced from 200 to 32 for better fit)
+    font_size = 32
+    # Define position variable (note: has typo 'postion' and not actually used in function)
+    postion = 0
+    # "serial" (one image after another), or opt in to "parallel" (process pool,
+    # uses every CPU) or "pipelined" (threads that read and write ahead, for images on network drives)
+    mode = "serial"
+    # Number of worker processes for the parallel mode (None = one per CPU)
+    workers = None
+    # Set to True to only process images that changed since the last run
+    incremental = False
+    # Also process images in sub-folders of input_dir
+    recursive = False
+    # Largest width/height of the output (None = keep the original size), e.g. 1600 for web
+    max_dimension = None
+    # Encoder settings for the saved images (None = Pillow defaults)
+    save_options = None
+    if mode == "serial":
+        # Call the function to process all images, using the font_size variable instead of hardcoded value
+        add_watermark_text_to_folder(input_dir, output_dir,watermark_text,position=postion,font_size=font_size,
+                                     incremental=incremental, recursive=recursive,
+                                     max_dimension=max_dimension, save_options=save_options)
+    else:
+        if mode == "pipelined":
+            results = add_watermark_text_to_folder_pipelined(input_dir, output_dir, watermark_text,
+                                                             position=postion, font_size=font_size,
+                                                             incremental=incremental, recursive=recursive,
+                                                             max_dimension=max_dimension, save_options=save_options)
+        else:
+            results = add_watermark_text_to_folder_parallel(input_dir, output_dir, watermark_text,
+                                                            position=postion, font_size=font_size, workers=workers,
+                                                            incremental=incremental, recursive=recursive,
+                                                            max_dimension=max_dimension, save_options=save_options)
+        print(f"Watermarked {sum(1 for r in results if not r['error'])} of {len(results)} images")
@@ -0,0 +1,119 @@
+"""Render one chart per station (or per state) to image files, without a display.
+
+Uses matplotlib's Agg backend, so it runs on servers and in cron jobs, and
+spreads the charts over a pool of worker processes. Each worker memory-maps
+the cached columns of the CSV once (see weather_data.load_weather_cached)
+and then only looks up the rows of the chart it is drawing.
+
+Examples:
+    python render_charts.py
+    python render_charts.py --by state --format svg --output charts/states
+    python render_charts.py --column "Data.Precipitation" --period week --how sum
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")  # Must be chosen before anything imports pyplot
+
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+
+from weather_data import load_weather_cached
+from weather_plot import DownsampledLine
+from weather_query import AGGREGATES, GROUPINGS, STATE_COLUMN, STATION_COLUMN, WeatherIndex
+
+GROUP_COLUMNS = {"station": STATION_COLUMN, "state": STATE_COLUMN}
+
+# Set in every worker process by _init_worker
+_index = None
+_options = None
+
+
+def _init_worker(path, options):
+    """Load the weather data once per worker process instead of once per chart."""
+    global _index, _options
+    _index = WeatherIndex(load_weather_cached(path))
+    _options = options
+
+
+def _file_name(label):
+    """A safe file name for a station code or state name: "New Mexico" -> "New_Mexico"."""
+    return re.sub(r"[^\w-]+", "_", label).strip("_") or "unnamed"
+
+
+def render_chart(label):
+    """Draw the chart of one station or state and save it; returns the file written (or None)."""
+    options = _options
+    filters = {"stations" if options["by"] == "station" else "states": [label]}
+    dates, values = _index.aggregate(options["column"], by=options["period"], how=options["how"], **filters)
+    if len(dates) == 0:
+        return None
+
+    # A bare Figure (not pyplot) is not tracked by pyplot, so nothing piles up in long runs
+    fig = Figure(figsize=options["size"], dpi=options["dpi"])
+    ax = fig.subplots()
+    # Markers keep short series (a single reading draws no line at all) visible
+    marker = "o" if len(dates) <= 50 else None
+    DownsampledLine(ax, mdates.date2num(dates), values, color="blue", marker=marker)
+    ax.xaxis_date()
+    fig.autofmt_xdate()
+    ax.set_title(f"{label}: {options['column']} ({options['how']} per {options['period']})")
+    ax.set_ylabel(options["column"].split(".")[-1])
+    path = Path(options["output"]) / f"{_file_name(label)}.{options['format']}"
+    fig.savefig(path)
+    return str(path)
+
+
+def render_all(path, output, by="station", column="Data.Temperature.Max Temp", period="day", how="avg",
+               image_format="png", size=(10, 4), dpi=100, workers=None, only=None):
+    """Render a chart for every station or state (or just those in only); returns the files written."""
+    # Build the cache up front, so the workers all memory-map it instead of each parsing the CSV
+    weather = load_weather_cached(path)
+    labels = [str(label) for label in weather.labels[GROUP_COLUMNS[by]]]
+    if only is not None:
+        wanted = set(only)
+        labels = [label for label in labels if label in wanted]
+    Path(output).mkdir(parents=True, exist_ok=True)
+
+    options = {"by": by, "column": column, "period": period, "how": how, "format": image_format,
+               "size": size, "dpi": dpi, "output": str(output)}
+    workers = workers or os.cpu_count()
+    # Several charts per task keep the inter-process overhead small next to the drawing
+    chunk_size = max(1, min(16, len(labels) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(path), options)) as executor:
+        written = [file for file in executor.map(render_chart, labels, chunksize=chunk_size) if file]
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render weather charts to image files")
+    parser.add_argument("--data", default="data/weather.csv", help="weather CSV file")
+    parser.add_argument("--output", default="charts", help="folder for the chart files")
+    parser.add_argument("--by", choices=sorted(GROUP_COLUMNS), default="station", help="one chart per ...")
+    parser.add_argument("--only", nargs="+", help="only these station codes or state names")
+    parser.add_argument("--column", default="Data.Temperature.Max Temp")
+    parser.add_argument("--period", choices=GROUPINGS, default="day")
+    parser.add_argument("--how", choices=AGGREGATES, default="avg")
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--width", type=float, default=10, help="inches")
+    parser.add_argument("--height", type=float, default=4, help="inches")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = render_all(args.data, args.output, by=args.by, column=args.column, period=args.period,
+                         how=args.how, image_format=args.format, size=(args.width, args.height),
+                         dpi=args.dpi, workers=args.workers, only=args.only)
+    print(f"Rendered {len(written)} charts to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
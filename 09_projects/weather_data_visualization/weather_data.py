@@ -0,0 +1,189 @@
+"""Load weather.csv into typed, column-by-column NumPy arrays.
+
+Instead of keeping every row as a list of strings, the CSV is streamed in
+chunks and each column is converted to one compact array:
+
+- "Date.Full"  -> datetime64[D]
+- "Data.*"     -> float64 (temperatures, precipitation, wind); empty cells become NaN
+- "Station.*"  -> categorical: int32 codes plus one array of distinct labels
+
+load_weather_cached() also saves those arrays as .npy files next to the CSV
+and memory-maps them on later runs, so the CSV is only parsed again after it
+changes.
+"""
+import csv
+import json
+import os
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+DATE_COLUMN = "Date.Full"
+CATEGORY_COLUMNS = ("Station.City", "Station.Code", "Station.Location", "Station.State")
+# Rows converted to arrays at a time while streaming the file
+CHUNK_ROWS = 65536
+# Bump when the cache layout changes, so old caches are rebuilt
+CACHE_VERSION = 1
+
+
+class WeatherData:
+    """Parsed weather data held as one NumPy array per column."""
+
+    def __init__(self, dates, numbers, codes, labels):
+        self.dates = dates        # datetime64[D] array
+        self.numbers = numbers    # {"Data.Temperature.Max Temp": float64 array, ...}
+        self.codes = codes        # {"Station.Code": int32 array of indexes into labels[...]}
+        self.labels = labels      # {"Station.Code": array of distinct values}
+
+    def __len__(self):
+        return len(self.dates)
+
+    def column(self, name):
+        """The values of a column: dates, floats, or (decoded) category labels."""
+        if name == DATE_COLUMN:
+            return self.dates
+        if name in self.numbers:
+            return self.numbers[name]
+        return self.labels[name][self.codes[name]]
+
+
+class _CategoryEncoder:
+    """Maps each distinct string to a small integer code, in order of first appearance."""
+
+    def __init__(self):
+        self.index = {}
+
+    def encode(self, values):
+        index = self.index
+        return np.fromiter((index.setdefault(value, len(index)) for value in values),
+                           dtype=np.int32, count=len(values))
+
+    def labels(self):
+        return np.array(list(self.index), dtype=str)
+
+
+def _floats(values):
+    """Convert strings to a float64 array; empty cells (missing readings) become NaN."""
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        return np.array([value or "nan" for value in values], dtype=np.float64)
+
+
+def _read_chunks(rows, chunk_rows):
+    """Turn an iterator of CSV rows into lists of column strings, chunk_rows rows at a time."""
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield list(zip(*chunk))
+
+
+def parse_rows(rows, header, chunk_rows=CHUNK_ROWS):
+    """Build a WeatherData from CSV rows (lists of strings) that follow header."""
+    date_at = header.index(DATE_COLUMN)
+    number_at = {name: i for i, name in enumerate(header) if name.startswith("Data.")}
+    category_at = {name: header.index(name) for name in CATEGORY_COLUMNS if name in header}
+    encoders = {name: _CategoryEncoder() for name in category_at}
+
+    date_parts, number_parts, code_parts = [], {name: [] for name in number_at}, {name: [] for name in category_at}
+    for columns in _read_chunks(iter(rows), chunk_rows):
+        # NumPy parses "YYYY-MM-DD" strings in C, much faster than datetime.strptime per row
+        date_parts.append(np.array(columns[date_at], dtype="datetime64[D]"))
+        for name, i in number_at.items():
+            number_parts[name].append(_floats(columns[i]))
+        for name, i in category_at.items():
+            code_parts[name].append(encoders[name].encode(columns[i]))
+
+    def join(parts, dtype):
+        return np.concatenate(parts) if parts else np.array([], dtype=dtype)
+
+    return WeatherData(
+        dates=join(date_parts, "datetime64[D]"),
+        numbers={name: join(parts, np.float64) for name, parts in number_parts.items()},
+        codes={name: join(parts, np.int32) for name, parts in code_parts.items()},
+        labels={name: encoder.labels() for name, encoder in encoders.items()},
+    )
+
+
+def load_weather(path, chunk_rows=CHUNK_ROWS):
+    """Stream a weather CSV file from disk into a WeatherData."""
+    with Path(path).open(newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        return parse_rows(reader, header, chunk_rows)
+
+
+def cache_dir_for(path):
+    """Folder holding the binary cache of a CSV file: data/weather.csv -> data/.weather.csv.cache"""
+    path = Path(path)
+    return path.with_name(f".{path.name}.cache")
+
+
+def save_cache(weather, cache_dir, source_stat):
+    """Write every column of weather to cache_dir as .npy files, tagged with the CSV's size and mtime."""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(exist_ok=True)
+    meta_path = cache_dir / "meta.json"
+    # meta.json marks the cache as complete, so it goes first and comes back last
+    meta_path.unlink(missing_ok=True)
+    np.save(cache_dir / "dates.npy", weather.dates)
+    numbers = list(weather.numbers)
+    categories = list(weather.codes)
+    for i, name in enumerate(numbers):
+        np.save(cache_dir / f"number_{i}.npy", weather.numbers[name])
+    for i, name in enumerate(categories):
+        np.save(cache_dir / f"codes_{i}.npy", weather.codes[name])
+        np.save(cache_dir / f"labels_{i}.npy", weather.labels[name])
+    meta = {
+        "version": CACHE_VERSION,
+        "size": source_stat.st_size,
+        "mtime_ns": source_stat.st_mtime_ns,
+        "numbers": numbers,
+        "categories": categories,
+    }
+    temp_path = cache_dir / "meta.json.tmp"
+    temp_path.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(temp_path, meta_path)
+
+
+def load_cache(cache_dir, source_stat):
+    """Memory-map a cache written by save_cache, or return None if it is missing or stale."""
+    cache_dir = Path(cache_dir)
+    try:
+        meta = json.loads((cache_dir / "meta.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if (meta.get("version"), meta.get("size"), meta.get("mtime_ns")) != \
+            (CACHE_VERSION, source_stat.st_size, source_stat.st_mtime_ns):
+        return None
+    try:
+        # mmap_mode="r" maps the files instead of reading them: loading is almost free
+        # and pages are only read from disk when the data is actually used
+        return WeatherData(
+            dates=np.load(cache_dir / "dates.npy", mmap_mode="r"),
+            numbers={name: np.load(cache_dir / f"number_{i}.npy", mmap_mode="r")
+                     for i, name in enumerate(meta["numbers"])},
+            codes={name: np.load(cache_dir / f"codes_{i}.npy", mmap_mode="r")
+                   for i, name in enumerate(meta["categories"])},
+            labels={name: np.load(cache_dir / f"labels_{i}.npy")
+                    for i, name in enumerate(meta["categories"])},
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def load_weather_cached(path, chunk_rows=CHUNK_ROWS):
+    """Like load_weather, but reuses the binary cache next to the CSV while the CSV is unchanged."""
+    source_stat = os.stat(path)
+    cache_dir = cache_dir_for(path)
+    weather = load_cache(cache_dir, source_stat)
+    if weather is None:
+        weather = load_weather(path, chunk_rows)
+        try:
+            save_cache(weather, cache_dir, source_stat)
+        except OSError as error:
+            # A read-only data folder just means no cache
+            print(f"Could not write weather cache to {cache_dir}: {error}")
+    return weather
@@ -0,0 +1,182 @@
+"""Fold many weather CSV files into per-station summaries with bounded memory.
+
+Every file matching a glob pattern (plain .csv or gzip-compressed .csv.gz) is
+streamed in chunks of rows. Each chunk is parsed into typed arrays, folded
+into running per-station statistics (count, min, max, mean of every "Data.*"
+column) and then dropped, so memory use depends on the chunk size and the
+number of stations, not on the number of rows. Files can be processed in
+parallel worker processes; their summaries are merged at the end.
+
+Examples:
+    python weather_ingest.py "dumps/*.csv.gz"
+    python weather_ingest.py "dumps/**/*.csv*" --workers 4 --output summary.json
+"""
+import argparse
+import csv
+import glob
+import gzip
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from weather_data import CHUNK_ROWS, parse_rows
+
+STATION_COLUMN = "Station.Code"
+
+
+def open_csv(path):
+    """Open a CSV file for reading as text, decompressing it on the fly if it ends in .gz."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return open(path, newline="", encoding="utf-8")
+
+
+def _new_stats(size):
+    return {
+        "count": np.zeros(size, dtype=np.int64),
+        "sum": np.zeros(size, dtype=np.float64),
+        "min": np.full(size, np.inf),
+        "max": np.full(size, -np.inf),
+    }
+
+
+class StationSummary:
+    """Running per-station statistics; arrays grow by one slot per new station."""
+
+    def __init__(self):
+        self.stations = {}                          # {"BHM": slot in the arrays below}
+        self.rows = np.zeros(0, dtype=np.int64)     # rows seen per station
+        self.columns = {}                           # {"Data.Wind.Speed": {"count": array, "sum": ..., "min": ..., "max": ...}}
+        self.first_date = None
+        self.last_date = None
+        self.files = 0
+
+    def _slots(self, labels):
+        """Slots for the given station codes, adding the ones not seen before."""
+        slots = np.array([self.stations.setdefault(str(label), len(self.stations)) for label in labels],
+                         dtype=np.intp)
+        grow = len(self.stations) - len(self.rows)
+        if grow:
+            self.rows = np.concatenate([self.rows, np.zeros(grow, dtype=np.int64)])
+            for name, stats in self.columns.items():
+                extra = _new_stats(grow)
+                self.columns[name] = {key: np.concatenate([stats[key], extra[key]]) for key in stats}
+        return slots
+
+    def _column(self, name):
+        if name not in self.columns:
+            self.columns[name] = _new_stats(len(self.rows))
+        return self.columns[name]
+
+    def _dates(self, first, last):
+        if first is None:
+            return
+        self.first_date = first if self.first_date is None else min(self.first_date, first)
+        self.last_date = last if self.last_date is None else max(self.last_date, last)
+
+    def add(self, weather):
+        """Fold a WeatherData (usually one chunk of a file) into the summary."""
+        if len(weather) == 0:
+            return
+        # Chunk-local station codes -> summary slots, one lookup per distinct station
+        slots = self._slots(weather.labels[STATION_COLUMN])[weather.codes[STATION_COLUMN]]
+        self.rows += np.bincount(slots, minlength=len(self.rows))
+        self._dates(weather.dates.min(), weather.dates.max())
+        for name, values in weather.numbers.items():
+            present = ~np.isnan(values)
+            self._fold(self._column(name), slots[present], values[present], values[present],
+                       np.ones(present.sum(), dtype=np.int64), values[present])
+
+    def _fold(self, stats, slots, lows, highs, counts, sums):
+        size = len(self.rows)
+        stats["count"] += np.bincount(slots, weights=counts, minlength=size).astype(np.int64)
+        stats["sum"] += np.bincount(slots, weights=sums, minlength=size)
+        np.minimum.at(stats["min"], slots, lows)
+        np.maximum.at(stats["max"], slots, highs)
+
+    def merge(self, other):
+        """Fold another StationSummary (e.g. from a worker process) into this one."""
+        slots = self._slots(list(other.stations))
+        self.rows[slots] += other.rows
+        self._dates(other.first_date, other.last_date)
+        self.files += other.files
+        for name, stats in other.columns.items():
+            self._fold(self._column(name), slots, stats["min"], stats["max"], stats["count"], stats["sum"])
+
+    def to_dict(self):
+        """Plain dict of the results: {station: {"rows": n, column: {"count", "min", "max", "mean"}}}."""
+        result = {}
+        for station, slot in sorted(self.stations.items()):
+            entry = {"rows": int(self.rows[slot])}
+            for name, stats in self.columns.items():
+                count = int(stats["count"][slot])
+                if count:
+                    entry[name] = {
+                        "count": count,
+                        "min": float(stats["min"][slot]),
+                        "max": float(stats["max"][slot]),
+                        "mean": float(stats["sum"][slot] / count),
+                    }
+            result[station] = entry
+        return result
+
+
+def summarize_file(path, chunk_rows=CHUNK_ROWS):
+    """Stream one CSV (or .csv.gz) file chunk by chunk into a StationSummary."""
+    summary = StationSummary()
+    with open_csv(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return summary
+        while True:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                break
+            summary.add(parse_rows(chunk, header, chunk_rows))
+    summary.files = 1
+    return summary
+
+
+def summarize_files(pattern, workers=1, chunk_rows=CHUNK_ROWS):
+    """Summarize every file matching the glob pattern, in parallel when workers > 1."""
+    paths = sorted(glob.glob(str(pattern), recursive=True))
+    summary = StationSummary()
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for file_summary in executor.map(summarize_file, paths, [chunk_rows] * len(paths)):
+                summary.merge(file_summary)
+    else:
+        for path in paths:
+            summary.merge(summarize_file(path, chunk_rows))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize weather CSV files per station")
+    parser.add_argument("pattern", help='glob of CSV or .csv.gz files, e.g. "dumps/*.csv.gz" (quote it)')
+    parser.add_argument("--workers", type=int, default=1, help="files processed in parallel")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows parsed at a time")
+    parser.add_argument("--output", help="write the summary as JSON to this file instead of printing it")
+    args = parser.parse_args()
+
+    summary = summarize_files(args.pattern, args.workers, args.chunk_rows)
+    report = {
+        "files": summary.files,
+        "rows": int(summary.rows.sum()),
+        "first_date": None if summary.first_date is None else str(summary.first_date),
+        "last_date": None if summary.last_date is None else str(summary.last_date),
+        "stations": summary.to_dict(),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
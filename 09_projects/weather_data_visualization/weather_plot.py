@@ -0,0 +1,106 @@
+"""Plot long weather time series without handing every point to matplotlib.
+
+A line can never show more detail than the axes has pixels, so each series is
+cut into one bucket per pixel column and only the lowest and highest reading
+of every bucket is drawn (min/max downsampling). Spikes and dips stay visible,
+but the number of points drawn depends on the width of the plot, not on the
+number of rows. When the view is zoomed or panned, the visible range is
+re-sampled from the full data, so detail comes back as you zoom in.
+"""
+import matplotlib.dates as mdates
+import numpy as np
+
+STATION_COLUMN = "Station.Code"
+
+
+def downsample_minmax(x, y, buckets):
+    """Reduce sorted x/y arrays to at most two points (min and max) per bucket of equal x width."""
+    if len(x) <= 2 * buckets:
+        return x, y
+    # Bucket i covers [edges[i], edges[i + 1]); x is sorted, so each bucket is one slice
+    edges = np.linspace(x[0], x[-1], buckets + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1]))
+    starts = starts[starts < len(x)]
+    ends = np.append(starts[1:], len(x)) - 1
+    # fmin/fmax skip NaN (missing readings) unless a whole bucket is missing
+    lows = np.fmin.reduceat(y, starts)
+    highs = np.fmax.reduceat(y, starts)
+    # Each bucket becomes a vertical stroke from its first to its last sample
+    xs = np.empty(2 * len(starts))
+    ys = np.empty(2 * len(starts))
+    xs[0::2], xs[1::2] = x[starts], x[ends]
+    ys[0::2], ys[1::2] = lows, highs
+    return xs, ys
+
+
+class DownsampledLine:
+    """A Line2D that shows a min/max-downsampled view of a long x/y series."""
+
+    def __init__(self, ax, x, y, **line_options):
+        order = np.argsort(x, kind="stable")
+        self.x = np.asarray(x, dtype=np.float64)[order]
+        self.y = np.asarray(y, dtype=np.float64)[order]
+        self.ax = ax
+        (self.line,) = ax.plot(*downsample_minmax(self.x, self.y, self.buckets()), **line_options)
+
+    def buckets(self):
+        # One bucket per pixel column of the axes
+        return max(int(self.ax.get_window_extent().width), 1)
+
+    def update(self):
+        """Re-sample the part of the series that is inside the current x limits."""
+        low, high = sorted(self.ax.get_xlim())
+        # Keep one point on each side so the line still runs to the edges of the view
+        start = max(np.searchsorted(self.x, low) - 1, 0)
+        end = min(np.searchsorted(self.x, high, side="right") + 1, len(self.x))
+        self.line.set_data(*downsample_minmax(self.x[start:end], self.y[start:end], self.buckets()))
+
+
+def _connect(ax, lines):
+    """Re-sample lines whenever ax is zoomed, panned or resized."""
+    def update(*_):
+        for line in lines:
+            line.update()
+        ax.figure.canvas.draw_idle()
+
+    ax.callbacks.connect("xlim_changed", update)
+    ax.figure.canvas.mpl_connect("resize_event", update)
+
+
+def station_series(weather, column, stations=None):
+    """Yield (station code, dates, values) for every station, or only for the given codes."""
+    codes = weather.codes[STATION_COLUMN]
+    labels = weather.labels[STATION_COLUMN]
+    # One sort groups the rows by station, in date order within each station
+    order = np.lexsort((weather.dates, codes))
+    sorted_codes = codes[order]
+    bounds = np.searchsorted(sorted_codes, np.arange(len(labels) + 1))
+    wanted = None if stations is None else set(stations)
+    for code, label in enumerate(labels):
+        if wanted is not None and label not in wanted:
+            continue
+        rows = order[bounds[code]:bounds[code + 1]]
+        yield str(label), weather.dates[rows], weather.numbers[column][rows]
+
+
+def plot_weather(ax, weather, column, by_station=False, stations=None, **line_options):
+    """Plot a "Data.*" column over time on ax, downsampled to the axes width.
+
+    With by_station=True (or a list of station codes) every station gets its own
+    line and legend entry. Returns the DownsampledLine objects that were added.
+    """
+    if by_station or stations is not None:
+        series = list(station_series(weather, column, stations))
+    else:
+        series = [(None, weather.dates, weather.numbers[column])]
+
+    lines = []
+    for label, dates, values in series:
+        options = dict(line_options, label=label) if label is not None else line_options
+        # date2num turns datetime64 values into the float day numbers matplotlib uses
+        lines.append(DownsampledLine(ax, mdates.date2num(dates), values, **options))
+    ax.xaxis_date()
+    _connect(ax, lines)
+    if len(series) > 1:
+        ax.legend()
+    return lines
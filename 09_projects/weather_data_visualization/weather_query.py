@@ -0,0 +1,109 @@
+"""Filter and summarize weather data without re-reading the CSV.
+
+WeatherIndex sorts the rows once by station and date. After that, picking a
+station or a date range is a binary search instead of a scan, and grouping by
+day, week or month is done with NumPy on whole arrays:
+
+    index = WeatherIndex(load_weather_cached("data/weather.csv"))
+    months, highs = index.aggregate("Data.Temperature.Max Temp", by="month", how="max",
+                                    states=["Alabama"], start="2016-01-01", end="2016-06-30")
+"""
+import numpy as np
+
+STATION_COLUMN = "Station.Code"
+STATE_COLUMN = "Station.State"
+GROUPINGS = ("day", "week", "month")
+AGGREGATES = ("avg", "min", "max", "sum", "count")
+
+
+def _codes_for(weather, column, values):
+    """The category codes of the given labels; labels that do not occur are ignored."""
+    labels = weather.labels[column]
+    return np.flatnonzero(np.isin(labels, list(values)))
+
+
+def period_starts(dates, by):
+    """The first day of the day, week (starting Monday) or month each date falls in."""
+    if by == "day":
+        return dates.astype("datetime64[D]")
+    if by == "week":
+        days = dates.astype("datetime64[D]").astype(np.int64)
+        # Day 0 (1970-01-01) was a Thursday, so Mondays are the days where (day - 4) % 7 == 0
+        return (days - (days - 4) % 7).astype("datetime64[D]")
+    if by == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"Unknown grouping {by!r}, expected one of {GROUPINGS}")
+
+
+class WeatherIndex:
+    """Row indexes of a WeatherData, sorted by station and by date for fast lookups."""
+
+    def __init__(self, weather):
+        self.weather = weather
+        self.day_numbers = weather.dates.astype("datetime64[D]").astype(np.int64)
+        # Rows ordered by date: any date range is one contiguous slice
+        self.by_date = np.argsort(self.day_numbers, kind="stable")
+        self.sorted_days = self.day_numbers[self.by_date]
+        # Rows ordered by station, then date: one slice per station, in date order
+        if STATION_COLUMN in weather.codes:
+            codes = weather.codes[STATION_COLUMN]
+            self.by_station = np.lexsort((self.day_numbers, codes))
+            station_count = len(weather.labels[STATION_COLUMN])
+            self.station_bounds = np.searchsorted(codes[self.by_station], np.arange(station_count + 1))
+
+    @staticmethod
+    def _day(value, default):
+        if value is None:
+            return default
+        return np.datetime64(value, "D").astype(np.int64)
+
+    def rows(self, stations=None, states=None, start=None, end=None):
+        """Indexes of the rows matching every given filter (dates are inclusive)."""
+        first = self._day(start, np.iinfo(np.int64).min)
+        last = self._day(end, np.iinfo(np.int64).max)
+        if stations is None:
+            low = np.searchsorted(self.sorted_days, first)
+            high = np.searchsorted(self.sorted_days, last, side="right")
+            rows = self.by_date[low:high]
+        else:
+            parts = []
+            for code in _codes_for(self.weather, STATION_COLUMN, stations):
+                station_rows = self.by_station[self.station_bounds[code]:self.station_bounds[code + 1]]
+                # Within a station the rows are in date order, so the date range is a slice too
+                days = self.day_numbers[station_rows]
+                parts.append(station_rows[np.searchsorted(days, first):np.searchsorted(days, last, side="right")])
+            rows = np.concatenate(parts) if parts else np.array([], dtype=np.intp)
+        if states is not None:
+            state_codes = _codes_for(self.weather, STATE_COLUMN, states)
+            rows = rows[np.isin(self.weather.codes[STATE_COLUMN][rows], state_codes)]
+        return rows
+
+    def aggregate(self, column, by="month", how="avg", **filters):
+        """Group the matching rows by period and reduce column in each group.
+
+        Returns (period start dates, values) as two arrays sorted by date.
+        Missing readings (NaN) are left out; filters are the arguments of rows().
+        """
+        if how not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {how!r}, expected one of {AGGREGATES}")
+        rows = self.rows(**filters)
+        values = self.weather.numbers[column][rows]
+        present = ~np.isnan(values)
+        periods = period_starts(self.weather.dates[rows][present], by)
+        values = values[present]
+
+        starts, groups = np.unique(periods, return_inverse=True)
+        if how == "count":
+            return starts, np.bincount(groups, minlength=len(starts))
+        if how in ("avg", "sum"):
+            totals = np.bincount(groups, weights=values, minlength=len(starts))
+            if how == "sum":
+                return starts, totals
+            return starts, totals / np.bincount(groups, minlength=len(starts))
+        if len(starts) == 0:
+            return starts, values
+        # min/max: sort the values by group, then reduce each group's slice
+        order = np.argsort(groups, kind="stable")
+        bounds = np.searchsorted(groups[order], np.arange(len(starts)))
+        reduce = np.minimum if how == "min" else np.maximum
+        return starts, reduce.reduceat(values[order], bounds)
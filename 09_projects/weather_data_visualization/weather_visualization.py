@@ -1,28 +1,21 @@
 from pathlib import Path
 import matplotlib.pyplot as plt
-from datetime import datetime
-import csv
 
-path = Path("data/weather.csv")
-lines = path.read_text().splitlines()
-
-reader = csv.reader(lines)
-header_row = next(reader)
+from weather_data import load_weather_cached
+from weather_plot import plot_weather
 
-# for index, header_column in enumerate(header_row):
-#     print(index,header_column)
+path = Path("data/weather.csv")
+# Columns come back as typed arrays: dates as datetime64, temperatures as floats.
+# The parsed columns are cached next to the CSV, so later runs skip parsing.
+weather = load_weather_cached(path)
 
-temps, dates = [],[]
-for row in reader:
-    formatted_date = datetime.strptime(row[1],'%Y-%m-%d')
-    temps.append(row[10])
-    dates.append(formatted_date)
+# print(list(weather.numbers))  # names of the numeric "Data.*" columns
 
 fig, ax = plt.subplots()
 fig.autofmt_xdate()
 ax.set_title("Temps")
 ax.set_ylabel("Temperature", fontsize = 16, color="red")
-ax.plot(dates, temps, color="blue")
+# Only about two points per pixel column are drawn, and zooming re-samples the view,
+# so this stays fast for millions of rows. Use by_station=True for one line per station.
+plot_weather(ax, weather, "Data.Temperature.Max Temp", color="blue")
 plt.show()
-
-
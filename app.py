@@ -1,16 +1,215 @@
-import requests
+import argparse
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_URL = "https://www.python.org"
+# Bytes read from the socket and written to disk at a time
+CHUNK_SIZE = 64 * 1024
+# Seconds to wait for the connection, and then for each read
+TIMEOUT = (5, 30)
+# Saved next to the downloaded pages; remembers ETag/Last-Modified of every URL
+CACHE_NAME = ".http_cache.json"
+
+
+# Remembers the ETag and Last-Modified headers of every downloaded URL, so the
+# next run can ask the server "send it only if it changed" (a conditional GET).
+# Unchanged pages then cost one 304 response with headers only, and no write.
+class HttpCache:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    # Headers for a conditional request; only sent if our copy of the page still exists
+    def request_headers(self, url, target):
+        entry = self.entries.get(url)
+        if not entry or not Path(target).exists():
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url, response_headers):
+        entry = {"etag": response_headers.get("ETag"), "last_modified": response_headers.get("Last-Modified")}
+        with self.lock:
+            if entry["etag"] or entry["last_modified"]:
+                self.entries[url] = entry
+            else:
+                self.entries.pop(url, None)
+
+    def save(self):
+        with self.lock:
+            _write_atomically(self.path, json.dumps(self.entries, indent=2).encode("utf-8"))
+
+
+# One Session shared by all threads: connections to the same host are kept
+# alive and reused from its pool instead of being opened for every page
+def make_session(pool_size=8):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Where a mirrored URL is saved, like wget lays it out:
+#   https://host/docs/ and https://host/docs -> output_dir/host/docs/index.html
+#   https://host/style.css                   -> output_dir/host/style.css
+# A path without an extension is treated as a folder, so a page never sits where
+# the folder for the pages below it (/about and /about/team) has to go.
+# Raises ValueError for a URL that would be saved outside output_dir (/a/../../x).
+def output_path_for(url, output_dir):
+    parts = urlsplit(url)
+    host = parts.netloc.replace(":", "_")
+    if host in ("", ".", ".."):
+        raise ValueError(f"{url}: no host name to save it under")
+    # Resolve . and .. segments the way a browser does; a .. above the host is not allowed
+    segments = []
+    for segment in parts.path.split("/"):
+        if segment == "..":
+            if not segments:
+                raise ValueError(f"{url}: path goes above the site root")
+            segments.pop()
+        elif segment not in ("", "."):
+            segments.append(segment.replace("\\", "_"))  # Not a path separator on Windows either
+    if not segments or "." not in segments[-1]:
+        segments.append("index.html")
+    if parts.query:
+        segments[-1] += "_" + "".join(c if c.isalnum() else "_" for c in parts.query)
+    path = Path(output_dir, host, *segments)
+    root = Path(output_dir).resolve()
+    if root not in path.resolve().parents:
+        raise ValueError(f"{url}: would be saved outside {output_dir}")
+    return path
+
+
+# A deliberate copy of _UMASK and _permissions_for() in
+# 04_file_operations/02_json_operations/atomic_write.py, which this standalone
+# script cannot import; the reasons are explained there. Keep the two in step.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _permissions_for(path):
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+# Write into a temporary file in the same folder and rename it over path, so readers
+# only ever see the old or the new file, never a half-written one
+def _write_atomically(path, chunks):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(chunks, bytes):
+        chunks = [chunks]
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".part")
+    written = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # mkstemp makes the file private (0600); give it the mode a plain open() would
+            os.chmod(temp_path, _permissions_for(path))
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return written
+
+
+# Download url to path without holding the whole body in memory.
+# Returns (HTTP status, bytes written); a 304 from the cache check writes nothing.
+def fetch(session, url, path, timeout=TIMEOUT, cache=None):
+    headers = cache.request_headers(url, path) if cache else {}
+    with session.get(url, stream=True, timeout=timeout, headers=headers) as res:
+        if res.status_code == 304:
+            return res.status_code, 0
+        res.raise_for_status()
+        written = _write_atomically(path, res.iter_content(CHUNK_SIZE))
+        if cache:
+            cache.update(url, res.headers)
+        return res.status_code, written
+
+
+# Download every (url, path) job on a pool of threads.
+# Yields (url, path, status or None, bytes written or None, error or None) as downloads finish.
+def fetch_all(jobs, workers=8, timeout=TIMEOUT, session=None, cache=None):
+    session = session or make_session(workers)
+
+    def run(job):
+        url, path = job
+        try:
+            return (url, path, *fetch(session, url, path, timeout, cache), None)
+        except (requests.RequestException, OSError) as error:
+            return url, path, None, None, error
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # as_completed instead of map(): one slow page does not hold back the results after it
+        futures = [executor.submit(run, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
 
-res = requests.get("https://www.python.org")
+def main():
+    parser = argparse.ArgumentParser(description="Download web pages to disk")
+    parser.add_argument("urls", nargs="*", help=f"pages to download (default: {DEFAULT_URL} to index.html)")
+    parser.add_argument("--urls-file", help="file with one URL per line")
+    parser.add_argument("--output", default="mirror", help="folder to save pages in, one subfolder per host")
+    parser.add_argument("--workers", type=int, default=8, help="downloads running at the same time")
+    parser.add_argument("--no-cache", action="store_true", help="download every page even if it did not change")
+    args = parser.parse_args()
 
-path = Path("index.html")
-try:
-    with open(path, "w") as f:
-        f.write(res.text)
-except FileNotFoundError:
-    print("File not found")
-finally:
-    print("File written successfully")
+    urls = list(args.urls)
+    if args.urls_file:
+        with open(args.urls_file) as f:
+            urls += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if urls:
+        jobs = []
+        for url in urls:
+            try:
+                jobs.append((url, output_path_for(url, args.output)))
+            except ValueError as error:
+                print(f"Skipped {error}")
+        cache_path = Path(args.output, CACHE_NAME)
+    else:
+        jobs = [(DEFAULT_URL, Path("index.html"))]
+        cache_path = Path(CACHE_NAME)
+    cache = None if args.no_cache else HttpCache(cache_path)
 
+    failed = unchanged = 0
+    try:
+        for url, path, status, written, error in fetch_all(jobs, args.workers, cache=cache):
+            if error:
+                failed += 1
+                print(f"Failed {url}: {error}")
+            elif status == 304:
+                unchanged += 1
+                print(f"{url} not modified")
+            else:
+                print(f"{url} -> {path} ({written} bytes)")
+    finally:
+        if cache:
+            cache.save()
+    print(f"Downloaded {len(jobs) - failed - unchanged} of {len(jobs)} pages, {unchanged} not modified")
 
 
+if __name__ == "__main__":
+    main()